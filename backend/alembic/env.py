@@ -14,6 +14,7 @@ from app.models.project import Project
 from app.models.prompt import Prompt
 from app.models.chat import ChatSession, Message
 from app.models.file import File
+from app.models.llm_cache import LLMResponseCacheEntry
 
 # Import settings
 from app.core.config import get_settings
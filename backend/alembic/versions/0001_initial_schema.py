@@ -0,0 +1,111 @@
+"""Initial schema
+
+Matches the tables previously created by ``Base.metadata.create_all`` at
+startup. Databases created that way can be adopted with
+``alembic stamp 0001`` before upgrading.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    
+    op.create_table(
+        'projects',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_projects_id', 'projects', ['id'])
+    op.create_index('ix_projects_user_id', 'projects', ['user_id'])
+    
+    op.create_table(
+        'prompts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_prompts_id', 'prompts', ['id'])
+    op.create_index('ix_prompts_project_id', 'prompts', ['project_id'])
+    
+    op.create_table(
+        'chat_sessions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_chat_sessions_id', 'chat_sessions', ['id'])
+    op.create_index('ix_chat_sessions_project_id', 'chat_sessions', ['project_id'])
+    
+    op.create_table(
+        'messages',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('chat_session_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            'role',
+            sa.Enum('SYSTEM', 'USER', 'ASSISTANT', name='messagerole', native_enum=False),
+            nullable=False,
+        ),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['chat_session_id'], ['chat_sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_messages_id', 'messages', ['id'])
+    op.create_index('ix_messages_chat_session_id', 'messages', ['chat_session_id'])
+    
+    op.create_table(
+        'files',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('provider_file_id', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_files_id', 'files', ['id'])
+    op.create_index('ix_files_project_id', 'files', ['project_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('files')
+    op.drop_table('messages')
+    op.drop_table('chat_sessions')
+    op.drop_table('prompts')
+    op.drop_table('projects')
+    op.drop_table('users')
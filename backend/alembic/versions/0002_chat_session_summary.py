@@ -0,0 +1,31 @@
+"""Rolling summary columns on chat_sessions
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_message_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'summary_until')
+    op.drop_column('chat_sessions', 'summary_message_id')
+    op.drop_column('chat_sessions', 'summary')
@@ -0,0 +1,63 @@
+"""Composite indexes for hot query paths
+
+Adds composite indexes matching how messages, prompts and projects are
+filtered and sorted, and drops the indexes they make redundant: the
+single-column indexes on their leading columns and the extra indexes on
+primary keys (already covered by the primary key constraint).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIMARY_KEY_INDEXES = [
+    ('ix_users_id', 'users'),
+    ('ix_projects_id', 'projects'),
+    ('ix_prompts_id', 'prompts'),
+    ('ix_chat_sessions_id', 'chat_sessions'),
+    ('ix_messages_id', 'messages'),
+    ('ix_files_id', 'files'),
+]
+
+
+def upgrade() -> None:
+    op.create_index('ix_messages_session_timestamp', 'messages', ['chat_session_id', 'timestamp'])
+    op.create_index('ix_prompts_project_created', 'prompts', ['project_id', 'created_at'])
+    op.create_index(
+        'ix_projects_user_created',
+        'projects',
+        ['user_id', sa.text('created_at DESC')],
+    )
+    
+    # Covered by the composite indexes above
+    op.drop_index('ix_messages_chat_session_id', table_name='messages')
+    op.drop_index('ix_prompts_project_id', table_name='prompts')
+    op.drop_index('ix_projects_user_id', table_name='projects')
+    
+    for index_name, table_name in PRIMARY_KEY_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
+
+
+def downgrade() -> None:
+    for index_name, table_name in PRIMARY_KEY_INDEXES:
+        op.create_index(index_name, table_name, ['id'])
+    
+    op.create_index('ix_projects_user_id', 'projects', ['user_id'])
+    op.create_index('ix_prompts_project_id', 'prompts', ['project_id'])
+    op.create_index('ix_messages_chat_session_id', 'messages', ['chat_session_id'])
+    
+    op.drop_index('ix_projects_user_created', table_name='projects')
+    op.drop_index('ix_prompts_project_created', table_name='prompts')
+    op.drop_index('ix_messages_session_timestamp', table_name='messages')
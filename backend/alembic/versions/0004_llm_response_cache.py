@@ -0,0 +1,40 @@
+"""LLM response cache table and per-project opt-in
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'projects',
+        sa.Column('response_cache_enabled', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.create_table(
+        'llm_response_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_llm_response_cache_expires_at', 'llm_response_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_response_cache_expires_at', table_name='llm_response_cache')
+    op.drop_table('llm_response_cache')
+    op.drop_column('projects', 'response_cache_enabled')
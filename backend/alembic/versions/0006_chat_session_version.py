@@ -0,0 +1,29 @@
+"""Version counter on chat_sessions for the session context cache
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'chat_sessions',
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'version')
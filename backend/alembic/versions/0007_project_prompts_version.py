@@ -0,0 +1,29 @@
+"""Prompt version counter on projects for the system prefix cache
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'projects',
+        sa.Column('prompts_version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'prompts_version')
@@ -7,7 +7,8 @@ from sqlalchemy import select
 from app.schemas.auth import UserRegister, Token
 from app.schemas.user import UserResponse
 from app.models.user import User
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_and_update_password, hash_password, create_access_token
+from app.core.auth_cache import auth_cache
 from app.db.session import get_db
 
 router = APIRouter()
@@ -32,7 +33,7 @@ async def register(
     # Create new user
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await hash_password(user_data.password),
     )
     
     db.add(user)
@@ -52,13 +53,23 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Stored hash uses an outdated cost (BCRYPT_ROUNDS changed): upgrade it transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        auth_cache.invalidate_user(user.id)
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
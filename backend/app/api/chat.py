@@ -1,35 +1,88 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import time
+from typing import Annotated, Any, AsyncIterator
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, tuple_
 import logging
 logger = logging.getLogger(__name__)
 
-from app.schemas.chat import ChatRequest, ChatResponse
+from app.schemas.chat import ChatRequest, ChatResponse, MessageResponse, MessageListResponse
+from app.models.chat import ChatSession, Message
+from app.models.project import Project
 from app.services.chat_service import ChatService
-from app.core.dependencies import CurrentUser
+from app.services.llm.registry import ProviderUnavailableError
+from app.services.llm.ratelimit import RateLimitError, retry_after_header
+from app.services.llm.resilience import llm_deadline
+from app.core.dependencies import CurrentUser, LLMRegistry, Compactor, LLMResponseCache, LLMSemanticCache, LLMSingleFlight
+from app.core.pagination import count_cache, decode_cursor, encode_cursor
+from app.core.metrics import observe_stage
 from app.db.session import get_db
 
 router = APIRouter()
 
 
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def get_chat_service(
+    chat_request: ChatRequest,
+    registry: LLMRegistry,
+    compactor: Compactor,
+    response_cache: LLMResponseCache,
+    semantic_cache: LLMSemanticCache,
+    single_flight: LLMSingleFlight,
+) -> ChatService:
+    """Build a ChatService bound to the requested (or default) LLM provider."""
+    try:
+        llm_provider = registry.get(chat_request.provider)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except ProviderUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"LLM provider unavailable: {str(e)}",
+        )
+    
+    return ChatService(
+        llm_provider,
+        compactor=compactor,
+        response_cache=response_cache,
+        semantic_cache=semantic_cache,
+        single_flight=single_flight,
+    )
+
+
 @router.post("", response_model=ChatResponse)
 async def chat(
     chat_request: ChatRequest,
     current_user: CurrentUser,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    chat_service: Annotated[ChatService, Depends(get_chat_service)],
 ):
     """
     Send a message and receive a response from the LLM.
     
     This endpoint:
-    1. Loads the project and its prompts
+    1. Loads the project and its compiled system prompts
     2. Builds the message context (system prompts + chat history)
     3. Calls the configured LLM provider
     4. Persists both user and assistant messages
     5. Returns the assistant's response
-    """
-    chat_service = ChatService(db)
     
+    The database work happens in short transactions before and after the
+    LLM call, so no connection is held while waiting on the provider.
+    
+    If the provider stays rate limited, nothing is persisted and a 429 with
+    Retry-After is returned.
+    """
     try:
         session, user_msg, assistant_msg = await chat_service.generate_response(
             project_id=chat_request.project_id,
@@ -38,23 +91,199 @@ async def chat(
             session_id=chat_request.session_id,
         )
         
-        await db.commit()
-        
         return ChatResponse(
             session_id=session.id,
             message=user_msg,
             assistant_message=assistant_msg,
         )
         
+    except RateLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers=retry_after_header(e.retry_after),
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         )
     except Exception as e:
-        await db.rollback()
         logger.exception("CHAT ENDPOINT CRASHED")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate response: {str(e)}",
         )
+
+
+@router.post("/stream")
+async def chat_stream(
+    chat_request: ChatRequest,
+    current_user: CurrentUser,
+    chat_service: Annotated[ChatService, Depends(get_chat_service)],
+):
+    """
+    Send a message and stream the LLM response as Server-Sent Events.
+    
+    Events, in order:
+    - ``session``: session id and the persisted user message
+    - ``delta``: a chunk of assistant text, sent as soon as the provider emits it
+    - ``error``: generation failed (the fallback text is still persisted). If the
+      provider stayed rate limited before sending anything, the error carries
+      ``status: 429`` and ``retry_after``, the turn is discarded and no ``done`` follows
+    - ``done``: the persisted assistant message plus ``ttft_ms`` / ``total_ms`` timings
+    """
+    try:
+        session, user_msg, messages = await chat_service.prepare_turn(
+            project_id=chat_request.project_id,
+            user_id=current_user.id,
+            user_message=chat_request.message,
+            session_id=chat_request.session_id,
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.exception("CHAT STREAM ENDPOINT CRASHED")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate response: {str(e)}",
+        )
+    
+    async def event_stream() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        ttft_ms: float | None = None
+        parts: list[str] = []
+        settled = False  # The turn has its reply saved, or has been discarded
+        
+        try:
+            yield _sse("session", {
+                "session_id": str(session.id),
+                "message": MessageResponse.model_validate(user_msg).model_dump(mode="json"),
+            })
+            
+            try:
+                # The deadline bounds the wait (and retries) until the first delta
+                with llm_deadline(chat_service.deadline_seconds):
+                    async for delta in chat_service.llm_provider.generate_stream(messages):
+                        if ttft_ms is None:
+                            ttft_ms = (time.perf_counter() - started) * 1000
+                        parts.append(delta)
+                        yield _sse("delta", {"content": delta})
+            except RateLimitError as e:
+                logger.warning("Chat stream rate limited for session %s: %s", session.id, e)
+                if not parts:
+                    await chat_service.discard_turn(session.id, user_msg.id)
+                    settled = True
+                    yield _sse("error", {"detail": str(e), "status": 429, "retry_after": e.retry_after})
+                    return
+                yield _sse("error", {"detail": str(e)})
+            except Exception as e:
+                logger.warning("Chat stream failed for session %s: %s", session.id, e)
+                if not parts:
+                    parts.append(f"I apologize, but I encountered an error: {str(e)}")
+                yield _sse("error", {"detail": str(e)})
+            
+            total_ms = (time.perf_counter() - started) * 1000
+            if ttft_ms is not None:
+                observe_stage("llm_first_token", ttft_ms / 1000)
+            observe_stage("llm_stream", total_ms / 1000)
+            
+            assistant_msg = await chat_service.save_assistant_message(session.id, "".join(parts))
+            settled = True
+            
+            logger.info(
+                "Chat stream session=%s ttft_ms=%s total_ms=%.1f",
+                session.id,
+                f"{ttft_ms:.1f}" if ttft_ms is not None else "n/a",
+                total_ms,
+            )
+            
+            yield _sse("done", {
+                "assistant_message": MessageResponse.model_validate(assistant_msg).model_dump(mode="json"),
+                "ttft_ms": ttft_ms,
+                "total_ms": total_ms,
+            })
+        finally:
+            if not settled:
+                # The client went away mid-stream (GeneratorExit / CancelledError skip the
+                # handlers above): keep the partial reply, or drop the turn if nothing was
+                # streamed, so the session doesn't end on an unanswered user message
+                logger.info(
+                    "Chat stream session=%s closed by the client after %d deltas",
+                    session.id,
+                    len(parts),
+                )
+                if parts:
+                    await asyncio.shield(chat_service.save_assistant_message(session.id, "".join(parts)))
+                else:
+                    await asyncio.shield(chat_service.discard_turn(session.id, user_msg.id))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/sessions/{session_id}/messages", response_model=MessageListResponse)
+async def list_session_messages(
+    session_id: UUID,
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
+    cursor: str | None = None,
+    include_total: bool = False,
+):
+    """
+    List the messages of a chat session, oldest first.
+    
+    Uses keyset pagination on (timestamp, id): pass the returned
+    `next_cursor` as `cursor` to fetch the next page.
+    """
+    # Verify session ownership through its project
+    result = await db.execute(
+        select(ChatSession.id)
+        .join(Project, Project.id == ChatSession.project_id)
+        .where(ChatSession.id == session_id)
+        .where(Project.user_id == current_user.id)
+    )
+    
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found",
+        )
+    
+    query = (
+        select(Message)
+        .where(Message.chat_session_id == session_id)
+        .order_by(Message.timestamp, Message.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(tuple_(Message.timestamp, Message.id) > decode_cursor(cursor))
+    
+    result = await db.execute(query)
+    messages = result.scalars().all()
+    
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1].timestamp, messages[-1].id)
+    
+    # Exact total is optional and cached briefly
+    total = None
+    if include_total:
+        total = count_cache.get(("messages", session_id))
+        if total is None:
+            count_result = await db.execute(
+                select(func.count(Message.id)).where(Message.chat_session_id == session_id)
+            )
+            total = count_result.scalar_one()
+            count_cache.set(("messages", session_id), total)
+    
+    return {"messages": messages, "next_cursor": next_cursor, "total": total}
@@ -1,12 +1,13 @@
 from typing import Annotated
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectListResponse
 from app.models.project import Project
 from app.core.dependencies import CurrentUser
+from app.core.pagination import count_cache, decode_cursor, encode_cursor
 from app.db.session import get_db
 
 router = APIRouter()
@@ -23,12 +24,16 @@ async def create_project(
         user_id=current_user.id,
         name=project_data.name,
         description=project_data.description,
+        response_cache_enabled=project_data.response_cache_enabled,
+        semantic_cache_enabled=project_data.semantic_cache_enabled,
     )
     
     db.add(project)
     await db.commit()
     await db.refresh(project)
     
+    count_cache.invalidate(("projects", current_user.id))
+    
     return project
 
 
@@ -36,27 +41,45 @@ async def create_project(
 async def list_projects(
     current_user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
-    skip: int = 0,
-    limit: int = 100,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
+    cursor: str | None = None,
+    include_total: bool = False,
 ):
-    """List all projects for the current user."""
-    # Get total count
-    count_result = await db.execute(
-        select(func.count(Project.id)).where(Project.user_id == current_user.id)
-    )
-    total = count_result.scalar_one()
+    """
+    List projects for the current user, newest first.
     
-    # Get projects
-    result = await db.execute(
+    Uses keyset pagination on (created_at, id): pass the returned
+    `next_cursor` as `cursor` to fetch the next page.
+    """
+    query = (
         select(Project)
         .where(Project.user_id == current_user.id)
-        .order_by(Project.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .limit(limit + 1)
     )
+    if cursor:
+        query = query.where(tuple_(Project.created_at, Project.id) < decode_cursor(cursor))
+    
+    result = await db.execute(query)
     projects = result.scalars().all()
     
-    return {"projects": projects, "total": total}
+    next_cursor = None
+    if len(projects) > limit:
+        projects = projects[:limit]
+        next_cursor = encode_cursor(projects[-1].created_at, projects[-1].id)
+    
+    # Exact total is optional and cached briefly
+    total = None
+    if include_total:
+        total = count_cache.get(("projects", current_user.id))
+        if total is None:
+            count_result = await db.execute(
+                select(func.count(Project.id)).where(Project.user_id == current_user.id)
+            )
+            total = count_result.scalar_one()
+            count_cache.set(("projects", current_user.id), total)
+    
+    return {"projects": projects, "next_cursor": next_cursor, "total": total}
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -1,13 +1,15 @@
 from typing import Annotated
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 
 from app.schemas.prompt import PromptCreate, PromptResponse, PromptListResponse
 from app.models.prompt import Prompt
 from app.models.project import Project
 from app.core.dependencies import CurrentUser
+from app.core.pagination import count_cache, decode_cursor, encode_cursor
+from app.services.prompt_cache import prompt_cache
 from app.db.session import get_db
 
 router = APIRouter()
@@ -41,9 +43,14 @@ async def create_prompt(
     )
     
     db.add(prompt)
+    # Workers' compiled system prefixes for this project are now stale
+    project.prompts_version = Project.prompts_version + 1
     await db.commit()
     await db.refresh(prompt)
     
+    count_cache.invalidate(("prompts", project_id))
+    prompt_cache.invalidate(project_id)
+    
     return prompt
 
 
@@ -52,8 +59,16 @@ async def list_prompts(
     project_id: UUID,
     current_user: CurrentUser,
     db: Annotated[AsyncSession, Depends(get_db)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
+    cursor: str | None = None,
+    include_total: bool = False,
 ):
-    """List all prompts for a project."""
+    """
+    List prompts for a project in creation order.
+    
+    Uses keyset pagination on (created_at, id): pass the returned
+    `next_cursor` as `cursor` to fetch the next page.
+    """
     # Verify project ownership
     result = await db.execute(
         select(Project)
@@ -68,18 +83,32 @@ async def list_prompts(
             detail="Project not found",
         )
     
-    # Get total count
-    count_result = await db.execute(
-        select(func.count(Prompt.id)).where(Prompt.project_id == project_id)
-    )
-    total = count_result.scalar_one()
-    
-    # Get prompts
-    result = await db.execute(
+    query = (
         select(Prompt)
         .where(Prompt.project_id == project_id)
-        .order_by(Prompt.created_at)
+        .order_by(Prompt.created_at, Prompt.id)
+        .limit(limit + 1)
     )
+    if cursor:
+        query = query.where(tuple_(Prompt.created_at, Prompt.id) > decode_cursor(cursor))
+    
+    result = await db.execute(query)
     prompts = result.scalars().all()
     
-    return {"prompts": prompts, "total": total}
+    next_cursor = None
+    if len(prompts) > limit:
+        prompts = prompts[:limit]
+        next_cursor = encode_cursor(prompts[-1].created_at, prompts[-1].id)
+    
+    # Exact total is optional and cached briefly
+    total = None
+    if include_total:
+        total = count_cache.get(("prompts", project_id))
+        if total is None:
+            count_result = await db.execute(
+                select(func.count(Prompt.id)).where(Prompt.project_id == project_id)
+            )
+            total = count_result.scalar_one()
+            count_cache.set(("prompts", project_id), total)
+    
+    return {"prompts": prompts, "next_cursor": next_cursor, "total": total}
@@ -0,0 +1,130 @@
+import time
+from collections import OrderedDict
+from typing import Any
+from uuid import UUID
+
+from app.core.config import get_settings
+from app.models.user import User
+
+settings = get_settings()
+
+
+class AuthCache:
+    """
+    Bounded in-process TTL cache of verified access token -> user snapshot.
+    
+    A hit skips both the JWT signature check and the user lookup. Entries
+    live for at most AUTH_CACHE_TTL seconds and never past the token's own
+    ``exp``. Anything that changes or removes a user (or revokes tokens)
+    must call ``invalidate_user`` / ``invalidate_token``.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int, enabled: bool = True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._tokens_by_user: dict[UUID, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, token: str) -> User | None:
+        """Return the cached user for a token, None on a miss or expiry."""
+        if not self.enabled:
+            return None
+        
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            self._remove(token)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+    
+    def set(self, token: str, user: User, token_exp: float | None = None) -> None:
+        """
+        Cache a verified token's user.
+        
+        Args:
+            token: The raw bearer token
+            user: The user loaded for it; a detached snapshot is stored
+            token_exp: The token's ``exp`` claim (unix time), caps the entry lifetime
+        """
+        if not self.enabled:
+            return
+        
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        
+        # Transient copy: not bound to the request's session, safe to share
+        snapshot = User(
+            id=user.id,
+            email=user.email,
+            hashed_password=user.hashed_password,
+            created_at=user.created_at,
+        )
+        
+        self._remove(token)
+        self._entries[token] = (time.monotonic() + ttl, snapshot)
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+        
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def invalidate_token(self, token: str) -> None:
+        """Drop a single token (e.g. on logout)."""
+        self._remove(token)
+    
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Drop every cached token of a user (e.g. on update, password change or delete)."""
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self._remove(token)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._tokens_by_user.clear()
+    
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+    
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        
+        user_id = entry[1].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+auth_cache = AuthCache(
+    ttl=settings.AUTH_CACHE_TTL,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    enabled=settings.AUTH_CACHE_ENABLED,
+)
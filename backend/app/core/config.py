@@ -8,20 +8,71 @@ class Settings(BaseSettings):
     # Application
     APP_NAME: str = "Chatbot Platform"
     DEBUG: bool = False
+    METRICS_ENABLED: bool = True  # Prometheus /metrics endpoint and per-request timing middleware
+    
+    # Health probes behind /health/ready, refreshed in the background (endpoints only read the results)
+    HEALTH_DATABASE_INTERVAL: float = 5.0  # Seconds between database probes
+    HEALTH_PROVIDER_INTERVAL: float = 30.0  # Seconds between LLM provider validate_connection probes
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    HEALTH_MAX_POOL_SATURATION: float = 1.0  # Unready at or above this share of DB connections checked out
     
     # Database
     DATABASE_URL: str
     
+    # Database connection pool
+    DB_POOL_CLASS: str = "queue"  # "queue", or "null" when an external pooler (pgbouncer) owns connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # Seconds, -1 disables
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    
+    # Pagination
+    PAGINATION_COUNT_TTL: float = 30.0  # Seconds an exact list total is cached
+    
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing (bcrypt runs on a dedicated thread pool, off the event loop)
+    BCRYPT_ROUNDS: int = 12  # Changing it rehashes passwords on their next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running hashes before 503
+    
+    # Authenticated-user cache (token -> user), skips JWT verify + user lookup on hits
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL: float = 60.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    
     # LLM Provider
-    LLM_PROVIDER: str = "groq"  # openai, openrouter, or groq
+    LLM_PROVIDER: str = "groq"  # openai, openrouter, groq, or mock (offline, for load tests)
     OPENAI_API_KEY: str | None = None
     OPENROUTER_API_KEY: str | None = None
     GROQ_API_KEY: str | None = None
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"  # Point either at benchmarks/stub_server.py to load-test offline
+    
+    # Mock provider (LLM_PROVIDER=mock): deterministic replies with simulated latency and failures
+    MOCK_LLM_LATENCY: float = 0.2  # Seconds to first token (median for longtail)
+    MOCK_LLM_LATENCY_DISTRIBUTION: str = "fixed"  # fixed, normal or longtail
+    MOCK_LLM_LATENCY_SPREAD: float = 0.5  # normal: stddev as a fraction of the latency; longtail: log-normal sigma
+    MOCK_LLM_TOKENS_PER_SECOND: float = 50.0
+    MOCK_LLM_RESPONSE_TOKENS: int = 64
+    MOCK_LLM_ERROR_RATE: float = 0.0  # Fraction of calls failing with a server error
+    MOCK_LLM_RATE_LIMIT_RATE: float = 0.0  # Fraction of calls failing with a 429
+    MOCK_LLM_SEED: int = 0
+    
+    # Additional named providers, e.g. "fast=groq:llama-3.1-8b-instant,smart=openai:gpt-4o-mini"
+    LLM_PROVIDERS: str = ""
+    LLM_DEFAULT_PROVIDER: str | None = None  # Defaults to LLM_PROVIDER
+    
+    # Latency-aware routing over registered providers, e.g. "groq,fast"; registered as "router"
+    LLM_ROUTER_BACKENDS: str = ""
+    LLM_ROUTER_HEDGE: bool = True  # Duplicate slow generate() calls to the next backend
+    LLM_ROUTER_HEDGE_MIN_DELAY: float = 0.5  # Floor for the p95-based hedge delay (seconds)
+    LLM_ROUTER_HEDGE_BUDGET: float = 0.1  # Max fraction of requests that may be hedged
+    LLM_ROUTER_EXPLORE: float = 0.05  # Fraction of requests led by a non-best backend
     
     # LLM Configuration
     LLM_MODEL: str = "llama-3.3-70b-versatile"  # Default Groq model
@@ -29,6 +80,62 @@ class Settings(BaseSettings):
     LLM_MAX_TOKENS: int = 1000
     LLM_TIMEOUT: int = 30
     
+    # Context window: prompt + history are fit into LLM_CONTEXT_TOKENS minus LLM_MAX_TOKENS
+    LLM_CONTEXT_TOKENS: int = 8192
+    LLM_CONTEXT_CACHE_SIZE: int = 100_000  # Cached per-message token counts
+    LLM_CONTEXT_MAX_MESSAGES: int = 200  # History rows loaded per turn before token truncation
+    SESSION_CACHE_ENABLED: bool = True  # Keep recent sessions' history in memory between turns
+    SESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PROMPT_CACHE_MAX_ENTRIES: int = 10_000  # Projects whose compiled system prompts are kept in memory
+    
+    # Rolling conversation summaries
+    SUMMARY_ENABLED: bool = True
+    SUMMARY_PROVIDER: str | None = None  # Registry name, defaults to the default provider
+    SUMMARY_THRESHOLD: int = 40  # Unsummarized messages that trigger a compaction
+    SUMMARY_KEEP_RECENT: int = 20  # Newest messages always kept verbatim
+    SUMMARY_CHUNK_TOKENS: int = 4000  # Summary + messages folded per summarizer call; must fit its context window
+    SUMMARY_CHUNK_MESSAGES: int = 200  # Max messages loaded per chunk
+    SUMMARY_RETRY_BACKOFF: float = 60.0  # Seconds before retrying a failed compaction, doubled per failure
+    SUMMARY_RETRY_MAX_BACKOFF: float = 3600.0
+    
+    # LLM HTTP connection pool (shared per provider, see app/services/llm/http.py)
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP2: bool = True  # Only used when the optional h2 package is installed
+    
+    # LLM rate limiting (per provider client); budgets are also learned from x-ratelimit-* headers
+    LLM_RATE_LIMIT_RPM: int | None = None  # Requests per minute, None = only provider headers
+    LLM_RATE_LIMIT_TPM: int | None = None  # Tokens per minute (prompt + max_tokens)
+    LLM_RATE_LIMIT_MAX_WAIT: float = 10.0  # Seconds a call may be queued / retried before 429
+    LLM_RATE_LIMIT_MAX_RETRIES: int = 2  # Re-sends after a provider 429
+    
+    # Exact-match LLM response cache (temperature 0, or projects with response_cache_enabled)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL: float = 3600.0
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # In-process tier
+    LLM_CACHE_SHARED: bool = False  # Also use the llm_response_cache table, shared by all workers
+    
+    # Share one provider call between concurrent identical requests
+    LLM_COALESCE_ENABLED: bool = True
+    
+    # Semantic cache of first-turn answers (projects with semantic_cache_enabled)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.75  # Min cosine similarity to reuse an answer (content words must match too)
+    SEMANTIC_CACHE_DIM: int = 512  # Hashing vectorizer buckets
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10_000  # Per project and prompt set, oldest overwritten first
+    SEMANTIC_CACHE_TTL: float = 86400.0
+    SEMANTIC_CACHE_MAX_INDEXES: int = 1000  # Least recently used (project, prompt set) indexes dropped first
+    SEMANTIC_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Across all indexes
+    
+    # LLM retries and circuit breaker (per provider)
+    CHAT_DEADLINE_SECONDS: float = 60.0  # End-to-end budget for a chat turn's LLM call, retries included
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BASE_DELAY: float = 0.25  # Full-jitter exponential backoff base (seconds)
+    LLM_RETRY_MAX_DELAY: float = 4.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    LLM_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # Seconds open before a half-open probe
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,244 @@
+import time
+from typing import Any, Iterator
+
+from fastapi import FastAPI
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.auth_cache import auth_cache
+from app.core.security import password_hash_stats
+from app.db.session import pool_stats
+from app.services.context import count_tokens, prompt_tokens
+from app.services.session_cache import session_cache
+from app.services.prompt_cache import prompt_cache
+
+# From cache hits (~1 ms) to slow LLM calls (~1 min)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CIRCUIT_STATES = ("closed", "half_open", "open")
+
+stage_seconds = Histogram(
+    "chatbot_stage_seconds",
+    "Time spent in each stage of a request (auth, chat turn steps, LLM call)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+request_seconds = Histogram(
+    "chatbot_http_request_duration_seconds",
+    "HTTP request latency by endpoint function (streams until their last event)",
+    ["method", "handler", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+requests_in_flight = Gauge(
+    "chatbot_http_requests_in_flight",
+    "HTTP requests currently being served, streams included",
+)
+llm_errors = Counter(
+    "chatbot_llm_provider_errors_total",
+    "Failed LLM provider attempts (retries count separately)",
+    ["provider", "kind"],
+)
+llm_tokens = Counter(
+    "chatbot_llm_tokens_total",
+    "Tokens sent to (in) and received from (out) LLM providers, estimated when tiktoken is absent",
+    ["provider", "direction"],
+)
+
+# Label children are looked up once; .labels() takes a lock on every call
+_stages: dict[str, Histogram] = {}
+
+
+def _stage(stage: str) -> Histogram:
+    child = _stages.get(stage)
+    if child is None:
+        child = _stages[stage] = stage_seconds.labels(stage)
+    return child
+
+
+def stage_timer(stage: str):
+    """Context manager that observes its block's duration as `stage`."""
+    return _stage(stage).time()
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record `seconds` spent in `stage`."""
+    _stage(stage).observe(seconds)
+
+
+def record_provider_error(provider: str, kind: str) -> None:
+    llm_errors.labels(provider, kind).inc()
+
+
+def record_tokens(provider: str, messages: list[dict[str, str]], reply: str) -> None:
+    """
+    Count a completed call's prompt and reply tokens.
+    
+    Chat turns pass the payload ContextWindow built, whose prompt total is
+    reused; only the reply is tokenized here.
+    """
+    llm_tokens.labels(provider, "in").inc(prompt_tokens(messages))
+    llm_tokens.labels(provider, "out").inc(count_tokens(reply))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request by endpoint.
+    
+    Requests are labelled with the endpoint function's name rather than the
+    path, so ids in URLs don't grow the label set; requests that match no
+    route are labelled ``unmatched``.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec()
+            endpoint = scope.get("endpoint")
+            request_seconds.labels(
+                scope["method"],
+                getattr(endpoint, "__name__", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+class AppStateCollector(Collector):
+    """
+    Exports pool, cache and provider statistics at scrape time.
+    
+    Reads the same ``stats()`` snapshots ``/health`` shows, so none of
+    these add work to the request path.
+    """
+    
+    def __init__(self, app: FastAPI):
+        self.app = app
+    
+    def collect(self) -> Iterator[Any]:
+        state = self.app.state
+        
+        yield from self._database_pool(pool_stats())
+        yield from self._llm(state.llm_registry)
+        
+        hashing = password_hash_stats()
+        yield GaugeMetricFamily(
+            "chatbot_password_hash_pending",
+            "Password hashes queued or running on the hashing pool",
+            value=hashing["pending"],
+        )
+        
+        caches = {
+            "auth": auth_cache.stats(),
+            "session": session_cache.stats(),
+            "prompt": prompt_cache.stats(),
+        }
+        if state.response_cache is not None:
+            caches["response"] = state.response_cache.stats()
+        if state.semantic_cache is not None:
+            caches["semantic"] = state.semantic_cache.stats()
+        
+        hits = CounterMetricFamily("chatbot_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("chatbot_cache_misses", "Cache misses", labels=["cache"])
+        for name, stats in caches.items():
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+        yield hits
+        yield misses
+        
+        if state.single_flight is not None:
+            coalescing = state.single_flight.stats()
+            yield GaugeMetricFamily(
+                "chatbot_llm_calls_in_flight",
+                "Distinct provider calls in flight (shared by coalesced requests)",
+                value=coalescing["in_flight"],
+            )
+            yield CounterMetricFamily(
+                "chatbot_llm_coalesced_requests",
+                "Requests that shared another request's provider call",
+                value=coalescing["coalesced"],
+            )
+    
+    @staticmethod
+    def _database_pool(stats: dict[str, Any]) -> Iterator[Any]:
+        if "checked_out" not in stats:
+            # NullPool: nothing pooled to report
+            return
+        
+        for key, help_text in (
+            ("size", "Configured database pool size"),
+            ("checked_out", "Database connections checked out"),
+            ("idle", "Idle database connections in the pool"),
+            ("overflow", "Database connections open beyond the pool size"),
+            ("saturation", "Checked-out connections over pool capacity (size + overflow)"),
+        ):
+            # Saturation is None when overflow is unlimited
+            if stats[key] is not None:
+                yield GaugeMetricFamily(f"chatbot_db_pool_{key}", help_text, value=stats[key])
+        
+        yield CounterMetricFamily(
+            "chatbot_db_pool_checkouts", "Database connection checkouts", value=stats["checkouts"]
+        )
+        yield CounterMetricFamily(
+            "chatbot_db_pool_checkout_timeouts",
+            "Checkouts that timed out waiting for a connection",
+            value=stats["checkout_timeouts"],
+        )
+    
+    @staticmethod
+    def _llm(registry: Any) -> Iterator[Any]:
+        connections = GaugeMetricFamily(
+            "chatbot_llm_pool_connections",
+            "LLM HTTP pool connections by state",
+            labels=["provider", "state"],
+        )
+        circuits = GaugeMetricFamily(
+            "chatbot_llm_circuit_state",
+            "1 for each provider's current circuit breaker state",
+            labels=["provider", "state"],
+        )
+        
+        for name, stats in registry.pool_stats().items():
+            if "connections" in stats:
+                connections.add_metric([name, "active"], stats["active"])
+                connections.add_metric([name, "idle"], stats["idle"])
+        
+        for name, current in registry.circuit_states().items():
+            for state in CIRCUIT_STATES:
+                circuits.add_metric([name, state], 1 if state == current else 0)
+        
+        yield connections
+        yield circuits
+
+
+def register_app_collector(app: FastAPI) -> Collector:
+    """Export `app`'s pools and caches on the default registry; unregister on shutdown."""
+    collector = AppStateCollector(app)
+    REGISTRY.register(collector)
+    return collector
+
+
+def unregister_app_collector(collector: Collector) -> None:
+    REGISTRY.unregister(collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """The default registry in Prometheus text format, with its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,69 @@
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Hashable
+from uuid import UUID
+from fastapi import HTTPException, status
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode a keyset position (sort timestamp, id) as an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+class CountCache:
+    """
+    Short-lived cache of exact list totals.
+    
+    Totals are optional on list endpoints; when requested they are served
+    from here for PAGINATION_COUNT_TTL seconds instead of running COUNT(*)
+    on every page. Writes that change a total should call invalidate().
+    """
+    
+    def __init__(self, ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, int]] = {}
+    
+    def get(self, key: Hashable) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, total = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        return total
+    
+    def set(self, key: Hashable, total: int) -> None:
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest insertion (dicts keep insertion order)
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self.ttl, total)
+    
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+
+count_cache = CountCache(ttl=settings.PAGINATION_COUNT_TTL)
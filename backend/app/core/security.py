@@ -1,5 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -8,20 +10,88 @@ from app.core.config import get_settings
 
 settings = get_settings()
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Password hashing context. Hashes made with a different cost are flagged by
+# needs_update / verify_and_update, so changing BCRYPT_ROUNDS migrates users on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop
+# without the pickling overhead of a process pool.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_pending = 0
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password."""
+    """Verify a plain password against a hashed password (blocking)."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
+    """Hash a password (blocking)."""
     return pwd_context.hash(password)
 
 
+async def _run_hash_job(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a bcrypt call on the hashing pool.
+    
+    Raises:
+        HTTPException: 503 if PASSWORD_HASH_MAX_PENDING jobs are already queued or running
+    """
+    global _hash_pending
+    
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _run_hash_job(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password without blocking the event loop.
+    
+    Returns:
+        (verified, new_hash) - new_hash is set when the stored hash uses an outdated
+        scheme or cost and should be replaced
+    """
+    return await _run_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def password_hash_stats() -> dict[str, int]:
+    """Hashing pool size and current queue depth."""
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "pending": _hash_pending,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+    }
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the hashing pool."""
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
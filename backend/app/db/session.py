@@ -1,17 +1,62 @@
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
 
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def _pool_options(settings: Settings) -> dict[str, Any]:
+    """Engine pool arguments for the configured DB_POOL_CLASS."""
+    if settings.DB_POOL_CLASS == "null":
+        # An external pooler (e.g. pgbouncer) owns the connections; open one per checkout
+        return {"poolclass": NullPool}
+    elif settings.DB_POOL_CLASS == "queue":
+        return {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+    else:
+        raise ValueError(f"Unknown DB_POOL_CLASS: {settings.DB_POOL_CLASS}")
+
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    poolclass=NullPool,  # Use NullPool for better async support
     future=True,
+    **_pool_options(settings),
 )
 
 # Create async session factory
@@ -35,3 +80,41 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+def pool_stats() -> dict[str, Any]:
+    """
+    Return a snapshot of the engine's connection pool.
+    
+    ``saturation`` is checked-out connections over the pool's capacity
+    (size + overflow); sustained values near 1.0 mean requests are queueing
+    for connections and ``wait_ms_avg`` / ``checkout_timeouts`` will rise.
+    With unlimited overflow (a negative DB_MAX_OVERFLOW) the pool has no
+    capacity to saturate, and both are None.
+    """
+    pool = engine.pool
+    
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"class": settings.DB_POOL_CLASS}
+    
+    checked_out = pool.checkedout()
+    if settings.DB_MAX_OVERFLOW < 0:
+        capacity = saturation = None
+    else:
+        capacity = pool.size() + settings.DB_MAX_OVERFLOW
+        saturation = round(checked_out / capacity, 3) if capacity else 0.0
+    
+    return {
+        "class": settings.DB_POOL_CLASS,
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": saturation,
+        "checkouts": pool.checkouts,
+        "checkout_timeouts": pool.checkout_timeouts,
+        "wait_ms_avg": round(pool.wait_seconds_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+        "wait_ms_max": round(pool.wait_seconds_max * 1000, 3),
+    }
@@ -1,20 +1,50 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.db.session import engine
-from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine, pool_stats
+from app.core.auth_cache import auth_cache
+from app.core.security import password_hash_stats, shutdown_password_hasher
+from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware, register_app_collector, render_metrics, unregister_app_collector
 from app.api import auth, users, projects, prompts, chat
+from app.services.llm.registry import LLMProviderRegistry
+from app.services.summarizer import create_session_compactor
+from app.services.session_cache import session_cache
+from app.services.prompt_cache import prompt_cache
+from app.services.llm.cache import create_response_cache
+from app.services.llm.semantic_cache import create_semantic_cache
+from app.services.llm.coalesce import create_single_flight
+from app.services.health import HealthMonitor
+
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager for startup and shutdown events."""
-    # Startup: Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: Build the LLM providers once so their HTTP connection pools are shared
+    app.state.llm_registry = LLMProviderRegistry.from_settings()
+    app.state.session_compactor = create_session_compactor(app.state.llm_registry)
+    app.state.response_cache = create_response_cache(AsyncSessionLocal)
+    app.state.semantic_cache = create_semantic_cache()
+    app.state.single_flight = create_single_flight()
+    app.state.health_monitor = HealthMonitor.from_settings(app.state.llm_registry)
+    await app.state.health_monitor.start()
+    metrics_collector = register_app_collector(app) if settings.METRICS_ENABLED else None
+    
     yield
+    
     # Shutdown: Clean up resources
+    await app.state.health_monitor.aclose()
+    if metrics_collector is not None:
+        unregister_app_collector(metrics_collector)
+    if app.state.session_compactor is not None:
+        await app.state.session_compactor.aclose()
+    await app.state.llm_registry.aclose()
+    shutdown_password_hasher()
     await engine.dispose()
 
 
@@ -34,6 +64,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency / in-flight metrics (outermost, so CORS and error handling are timed too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
@@ -48,7 +82,49 @@ async def root():
     return {"status": "healthy", "service": "chatbot-platform"}
 
 
+@app.get("/health/live")
+async def health_live():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """
+    Readiness probe: 503 while the database, its pool headroom or the default
+    LLM provider (reachability and circuit breaker) is failing.
+    
+    Reads the background probes' cached results, so polling it never
+    queries the database or calls the provider APIs.
+    """
+    ready, checks = app.state.health_monitor.readiness()
+    return JSONResponse(checks, status_code=200 if ready else 503)
+
+
 @app.get("/health")
 async def health():
-    """Detailed health check."""
-    return {"status": "ok", "database": "connected"}
+    """Detailed health check (always 200; use /health/ready for routing decisions)."""
+    ready, checks = app.state.health_monitor.readiness()
+    return {
+        "status": "ok" if ready else "degraded",
+        "database": "connected" if checks["database"]["ok"] else "unavailable",
+        "readiness": checks,
+        "database_pool": pool_stats(),
+        "llm_pool": app.state.llm_registry.pool_stats(),
+        "llm_circuits": app.state.llm_registry.circuit_states(),
+        "auth_cache": auth_cache.stats(),
+        "password_hashing": password_hash_stats(),
+        "response_cache": app.state.response_cache.stats() if app.state.response_cache else None,
+        "semantic_cache": app.state.semantic_cache.stats() if app.state.semantic_cache else None,
+        "session_cache": session_cache.stats(),
+        "prompt_cache": prompt_cache.stats(),
+        "coalescing": app.state.single_flight.stats() if app.state.single_flight else None,
+    }
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics for this worker process."""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import String, Text, ForeignKey, DateTime, Enum
+from sqlalchemy import String, Text, ForeignKey, DateTime, Enum, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -24,7 +24,6 @@ class ChatSession(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid4,
-        index=True,
     )
     project_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -34,6 +33,14 @@ class ChatSession(Base):
     )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     
+    # Rolling summary of older turns; messages up to the high-water mark are folded into it
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    summary_message_id: Mapped[UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    summary_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    
+    # Bumped by every write to the session's messages or summary (see SessionContextCache)
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="chat_sessions")
     messages: Mapped[list["Message"]] = relationship(
@@ -51,18 +58,20 @@ class Message(Base):
     """Message model for chat history."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # History loads filter by session and sort by time
+        Index("ix_messages_session_timestamp", "chat_session_id", "timestamp"),
+    )
     
     id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid4,
-        index=True,
     )
     chat_session_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("chat_sessions.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     role: Mapped[MessageRole] = mapped_column(
         Enum(MessageRole, native_enum=False),
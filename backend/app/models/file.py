@@ -16,7 +16,6 @@ class File(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid4,
-        index=True,
     )
     project_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
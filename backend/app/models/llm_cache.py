@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class LLMResponseCacheEntry(Base):
+    """Shared (cross-worker) tier of the LLM response cache."""
+    
+    __tablename__ = "llm_response_cache"
+    
+    # sha256 of the canonical request (model, parameters, messages)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<LLMResponseCacheEntry(key={self.key}, expires_at={self.expires_at})>"
@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import String, Text, ForeignKey, DateTime
+from sqlalchemy import Boolean, Integer, String, Text, ForeignKey, DateTime, Index, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -16,16 +16,30 @@ class Project(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid4,
-        index=True,
     )
     user_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Serve repeated identical requests from the LLM response cache even at temperature > 0
+    response_cache_enabled: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        server_default=false(),
+        nullable=False,
+    )
+    # Reuse answers to similar first questions (see SemanticCache)
+    semantic_cache_enabled: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        server_default=false(),
+        nullable=False,
+    )
+    # Bumped by every prompt write (see SystemPrefixCache)
+    prompts_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
@@ -34,6 +48,7 @@ class Project(Base):
         "Prompt",
         back_populates="project",
         cascade="all, delete-orphan",
+        order_by="Prompt.created_at",
     )
     chat_sessions: Mapped[list["ChatSession"]] = relationship(
         "ChatSession",
@@ -43,3 +58,7 @@ class Project(Base):
     
     def __repr__(self) -> str:
         return f"<Project(id={self.id}, name={self.name}, user_id={self.user_id})>"
+
+
+# Project listings filter by owner, newest first
+Index("ix_projects_user_created", Project.user_id, Project.created_at.desc())
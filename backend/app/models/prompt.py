@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Text, ForeignKey, DateTime
+from sqlalchemy import Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -11,18 +11,20 @@ class Prompt(Base):
     """Prompt model for agent system prompts."""
     
     __tablename__ = "prompts"
+    __table_args__ = (
+        # Prompts are always listed per project in creation order
+        Index("ix_prompts_project_created", "project_id", "created_at"),
+    )
     
     id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid4,
-        index=True,
     )
     project_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("projects.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -16,7 +16,6 @@ class User(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid4,
-        index=True,
     )
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
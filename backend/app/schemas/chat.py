@@ -35,11 +35,19 @@ class ChatSessionResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MessageListResponse(BaseModel):
+    """Schema for a page of session messages."""
+    messages: list[MessageResponse]
+    next_cursor: str | None = None  # Pass as `cursor` to fetch the next page
+    total: int | None = None  # Only set when include_total=true
+
+
 class ChatRequest(BaseModel):
     """Schema for chat request."""
     project_id: UUID
     message: str = Field(..., min_length=1)
     session_id: UUID | None = None
+    provider: str | None = None  # Named provider from LLM_PROVIDERS, defaults to the default provider
 
 
 class ChatResponse(BaseModel):
@@ -7,6 +7,8 @@ class ProjectBase(BaseModel):
     """Base project schema."""
     name: str = Field(..., min_length=1, max_length=255)
     description: str | None = None
+    response_cache_enabled: bool = False  # Cache LLM responses even when sampling isn't deterministic
+    semantic_cache_enabled: bool = False  # Reuse answers to similar first questions
 
 
 class ProjectCreate(ProjectBase):
@@ -18,6 +20,8 @@ class ProjectUpdate(BaseModel):
     """Schema for updating a project."""
     name: str | None = Field(None, min_length=1, max_length=255)
     description: str | None = None
+    response_cache_enabled: bool | None = None
+    semantic_cache_enabled: bool | None = None
 
 
 class ProjectResponse(ProjectBase):
@@ -30,6 +34,7 @@ class ProjectResponse(ProjectBase):
 
 
 class ProjectListResponse(BaseModel):
-    """Schema for list of projects."""
+    """Schema for a page of projects."""
     projects: list[ProjectResponse]
-    total: int
+    next_cursor: str | None = None  # Pass as `cursor` to fetch the next page
+    total: int | None = None  # Only set when include_total=true
@@ -28,6 +28,7 @@ class PromptResponse(PromptBase):
 
 
 class PromptListResponse(BaseModel):
-    """Schema for list of prompts."""
+    """Schema for a page of prompts."""
     prompts: list[PromptResponse]
-    total: int
+    next_cursor: str | None = None  # Pass as `cursor` to fetch the next page
+    total: int | None = None  # Only set when include_total=true
@@ -1,172 +1,423 @@
-from uuid import UUID
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+import time
+from typing import Iterable
+from uuid import UUID, uuid4
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import and_, delete, exists, or_, select, true, update
 
 from app.models.project import Project
-from app.models.chat import ChatSession, Message, MessageRole
 from app.models.prompt import Prompt
+from app.models.chat import ChatSession, Message, MessageRole
 from app.services.llm.base import LLMProvider
-from app.services.llm.openai import OpenAIProvider
-from app.services.llm.openrouter import OpenRouterProvider
-from app.services.llm.groq import GroqProvider
+from app.services.llm.ratelimit import RateLimitError
+from app.services.llm.resilience import llm_deadline
+from app.services.llm.cache import ResponseCache, canonical_key
+from app.services.llm.semantic_cache import SemanticCache
+from app.services.llm.coalesce import SingleFlight
+from app.services.context import ContextWindow, get_context_window
+from app.services.summarizer import SessionCompactor
+from app.services.session_cache import SessionContextCache, session_cache as default_session_cache
+from app.services.prompt_cache import SystemPrefix, prompt_cache
+from app.db.session import AsyncSessionLocal
 from app.core.config import get_settings
+from app.core.pagination import count_cache
+from app.core.metrics import observe_stage, stage_timer
 
 
 class ChatService:
-    """Service for handling chat operations with LLM integration."""
+    """
+    Service for handling chat operations with LLM integration.
     
-    def __init__(self, db: AsyncSession):
-        self.db = db
-        self.llm_provider = self._get_llm_provider()
+    A chat turn runs as two short transactions - one to load the context and
+    save the user message, one to save the assistant message - so no database
+    connection is checked out while waiting on the LLM. Each step is timed
+    in the ``chatbot_stage_seconds`` histogram.
+    """
     
-    def _get_llm_provider(self) -> LLMProvider:
-        """Get the configured LLM provider."""
-        settings = get_settings()
-        
-        if settings.LLM_PROVIDER == "openai":
-            return OpenAIProvider()
-        elif settings.LLM_PROVIDER == "openrouter":
-            return OpenRouterProvider()
-        elif settings.LLM_PROVIDER == "groq":
-            return GroqProvider()
-        else:
-            raise ValueError(f"Unknown LLM provider: {settings.LLM_PROVIDER}")
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        context_window: ContextWindow | None = None,
+        compactor: SessionCompactor | None = None,
+        response_cache: ResponseCache | None = None,
+        semantic_cache: SemanticCache | None = None,
+        single_flight: SingleFlight | None = None,
+        session_cache: SessionContextCache = default_session_cache,
+    ):
+        self.llm_provider = llm_provider
+        self.session_factory = session_factory
+        self.context_window = context_window or get_context_window()
+        self.compactor = compactor
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.single_flight = single_flight
+        self.session_cache = session_cache
+        self.history_limit = get_settings().LLM_CONTEXT_MAX_MESSAGES
+        self.deadline_seconds = get_settings().CHAT_DEADLINE_SECONDS
     
-    async def get_or_create_session(
+    async def load_context(
         self,
+        db: AsyncSession,
         project_id: UUID,
+        user_id: UUID,
         session_id: UUID | None = None
-    ) -> ChatSession:
-        """Get existing session or create a new one."""
-        if session_id:
-            result = await self.db.execute(
-                select(ChatSession)
-                .where(ChatSession.id == session_id)
-                .where(ChatSession.project_id == project_id)
-                .options(selectinload(ChatSession.messages))
+    ) -> tuple[Project | None, ChatSession | None, list[str] | None]:
+        """
+        Load the project, the chat session and (if needed) the prompts in one statement.
+        
+        Prompts are joined in only when the prefix cache has no entry for the
+        project or its entry is for another prompts_version or name, so a
+        cold cache doesn't cost an extra round trip.
+        
+        Returns:
+            Tuple of (project, chat_session, prompt_contents); project is None if
+            it doesn't exist or isn't owned by the user, chat_session is None if
+            no session_id was given or it doesn't belong to the project, and
+            prompt_contents is None if the cached prefix was current
+        """
+        cached = prompt_cache.peek(project_id)
+        if cached is None:
+            stale = true()
+        else:
+            stale = or_(Project.prompts_version != cached.version, Project.name != cached.name)
+        
+        # Session and prompts via outer joins on the project row
+        query = (
+            select(Project, ChatSession, Prompt.content)
+            .outerjoin(
+                ChatSession,
+                and_(ChatSession.project_id == Project.id, ChatSession.id == session_id),
             )
-            session = result.scalar_one_or_none()
-            
-            if session:
-                return session
+            .outerjoin(Prompt, and_(Prompt.project_id == Project.id, stale))
+            .where(Project.id == project_id)
+            .where(Project.user_id == user_id)
+            .order_by(Prompt.created_at, Prompt.id)
+        )
         
-        # Create new session
-        session = ChatSession(project_id=project_id)
-        self.db.add(session)
-        await self.db.flush()
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return None, None, None
+        
+        project, chat_session, _ = rows[0]
+        if cached is not None and cached.version == project.prompts_version and cached.name == project.name:
+            return project, chat_session, None
+        return project, chat_session, [content for _, _, content in rows if content is not None]
+    
+    async def load_history(self, db: AsyncSession, chat_session: ChatSession) -> list[Message]:
+        """
+        Load the session's most recent messages, oldest first.
+        
+        Only messages newer than the summary's high-water mark are loaded, and
+        at most LLM_CONTEXT_MAX_MESSAGES of them.
+        """
+        # Load chat history explicitly (never touch lazy relationships)
+        query = (
+            select(Message)
+            .where(Message.chat_session_id == chat_session.id)
+            .order_by(Message.timestamp.desc())
+            .limit(self.history_limit)
+        )
+        if chat_session.summary_until is not None:
+            query = query.where(Message.timestamp > chat_session.summary_until)
         
-        return session
+        result = await db.execute(query)
+        return list(reversed(result.scalars().all()))
     
-    async def build_messages(
+    async def load_system_prefix(
         self,
+        db: AsyncSession,
         project: Project,
+        prompt_contents: list[str] | None = None,
+    ) -> SystemPrefix:
+        """
+        The project's compiled system messages, from the prefix cache when current.
+        
+        Otherwise the prefix is compiled from `prompt_contents` (as loaded by
+        load_context), and prompts are only queried if they weren't loaded -
+        when the cache entry was dropped after load_context saw it current.
+        """
+        prefix = prompt_cache.get(project.id, project.prompts_version, project.name)
+        if prefix is not None:
+            return prefix
+        
+        if prompt_contents is None:
+            result = await db.execute(
+                select(Prompt.content)
+                .where(Prompt.project_id == project.id)
+                .order_by(Prompt.created_at, Prompt.id)
+            )
+            prompt_contents = result.scalars().all()
+        
+        prefix = SystemPrefix.compile(project.prompts_version, project.name, prompt_contents)
+        prompt_cache.set(project.id, prefix)
+        return prefix
+    
+    def build_messages(
+        self,
+        prefix: SystemPrefix,
         chat_session: ChatSession,
+        history: Iterable[tuple[UUID, str, str]],
         user_message: str
     ) -> list[dict[str, str]]:
-        """Build message list for LLM from project prompts and chat history."""
-        messages = []
-        
-        # Load prompts for the project
-        result = await self.db.execute(
-            select(Prompt)
-            .where(Prompt.project_id == project.id)
-            .order_by(Prompt.created_at)
-        )
-        prompts = result.scalars().all()
+        """
+        Build message list for LLM from the project's system prefix and chat history.
         
-        # Add system prompts
-        for prompt in prompts:
-            messages.append({
-                "role": "system",
-                "content": prompt.content
-            })
+        Older turns are represented by the session summary (if any); the
+        remaining history ((message_id, role, content) tuples, oldest first,
+        without system messages) is truncated to the most recent turns that
+        fit the context window.
+        """
+        # Compiled prompts (or the default instruction), identical across turns
+        messages = list(prefix.messages)
         
-        # If no prompts, add default system message
-        if not prompts:
+        # Summary of turns older than the history tail
+        if chat_session.summary:
             messages.append({
                 "role": "system",
-                "content": f"You are a helpful assistant for {project.name}."
+                "content": f"Summary of the earlier conversation:\n{chat_session.summary}"
             })
         
-        # Add chat history (load messages if not already loaded)
-        # Load chat history explicitly (never touch lazy relationships)
-        result = await self.db.execute(
-            select(Message)
-            .where(Message.chat_session_id == chat_session.id)
-            .order_by(Message.timestamp)
-        )
-        history_messages = result.scalars().all()
-
-        for msg in history_messages:
-            if msg.role != MessageRole.SYSTEM:
-                messages.append({
-                    "role": msg.role.value,
-                    "content": msg.content
-                })
-
-        
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": user_message
-        })
-        
-        return messages
+        # Fit history into the budget and add current user message
+        return self.context_window.build(messages, history, user_message)
     
-    async def generate_response(
+    async def prepare_turn(
         self,
         project_id: UUID,
         user_id: UUID,
         user_message: str,
         session_id: UUID | None = None
-    ) -> tuple[ChatSession, Message, Message]:
+    ) -> tuple[ChatSession, Message, list[dict[str, str]]]:
         """
-        Generate a response from the LLM.
+        Load the context for a chat turn and persist the user message.
+        
+        Runs in its own short transaction, committed before returning. Reads
+        take at most two statements: project + session (+ prompts when the
+        prefix cache isn't current), then a bounded history window for
+        existing sessions unless the session cache has it at the current
+        version.
         
         Returns:
-            Tuple of (chat_session, user_message, assistant_message)
+            Tuple of (chat_session, user_message, llm_messages)
         """
-        # Verify project ownership
-        result = await self.db.execute(
-            select(Project)
-            .where(Project.id == project_id)
-            .where(Project.user_id == user_id)
+        _, _, chat_session, user_msg, messages = await self._prepare_turn(
+            project_id, user_id, user_message, session_id
         )
-        project = result.scalar_one_or_none()
+        return chat_session, user_msg, messages
+    
+    async def _prepare_turn(
+        self,
+        project_id: UUID,
+        user_id: UUID,
+        user_message: str,
+        session_id: UUID | None = None
+    ) -> tuple[Project, SystemPrefix, ChatSession, Message, list[dict[str, str]]]:
+        """prepare_turn, also returning the loaded project and its system prefix."""
+        async with self.session_factory() as db, db.begin():
+            # Project ownership, session and (on a prefix cache miss) prompts in one round trip
+            with stage_timer("load_context"):
+                project, chat_session, prompt_contents = await self.load_context(
+                    db, project_id, user_id, session_id
+                )
+            
+            if not project:
+                raise ValueError("Project not found or access denied")
+            
+            is_new_session = chat_session is None
+            if not is_new_session:
+                with stage_timer("load_history"):
+                    context = self.session_cache.get(chat_session.id, chat_session.version)
+                    if context is None:
+                        loaded = await self.load_history(db, chat_session)
+                        self.session_cache.put(chat_session.id, chat_session.version, loaded)
+                        history = [
+                            (msg.id, msg.role.value, msg.content)
+                            for msg in loaded
+                            if msg.role != MessageRole.SYSTEM
+                        ]
+                    else:
+                        history = list(context.history())
+            else:
+                # Create new session (id assigned up front so no flush is needed)
+                chat_session = ChatSession(id=uuid4(), project_id=project_id, version=1)
+                db.add(chat_session)
+                history = []
+            
+            # Build messages for LLM
+            with stage_timer("load_prompts"):
+                prefix = await self.load_system_prefix(db, project, prompt_contents)
+            with stage_timer("build_messages"):
+                messages = self.build_messages(prefix, chat_session, history, user_message)
+            
+            # Save user message (timed through the commit)
+            saving = time.perf_counter()
+            user_msg = Message(
+                chat_session_id=chat_session.id,
+                role=MessageRole.USER,
+                content=user_message
+            )
+            db.add(user_msg)
+            
+            if not is_new_session:
+                version = await self._bump_version(db, chat_session.id)
         
-        if not project:
-            raise ValueError("Project not found or access denied")
+        observe_stage("save_user_message", time.perf_counter() - saving)
         
-        # Get or create session
-        chat_session = await self.get_or_create_session(project_id, session_id)
+        # Write the user message through to the cached context
+        if is_new_session:
+            self.session_cache.put(chat_session.id, chat_session.version, [user_msg])
+        else:
+            self.session_cache.append(chat_session.id, version, user_msg)
+        count_cache.invalidate(("messages", chat_session.id))
+        
+        # Fold older turns into the session summary in the background
+        if self.compactor is not None:
+            self.compactor.maybe_schedule(chat_session.id, len(history) + 1)
         
-        # Build messages for LLM
-        messages = await self.build_messages(project, chat_session, user_message)
+        return project, prefix, chat_session, user_msg, messages
+    
+    @staticmethod
+    async def _bump_version(db: AsyncSession, chat_session_id: UUID) -> int:
+        """
+        Atomically increment a session's version; returns the new value.
         
-        # Save user message
-        user_msg = Message(
-            chat_session_id=chat_session.id,
-            role=MessageRole.USER,
-            content=user_message
+        Every write to a session's messages must do this in its transaction
+        so other workers' cached contexts go stale (see SessionContextCache).
+        """
+        result = await db.execute(
+            update(ChatSession)
+            .where(ChatSession.id == chat_session_id)
+            .values(version=ChatSession.version + 1)
+            .returning(ChatSession.version)
+            .execution_options(synchronize_session=False)
         )
-        self.db.add(user_msg)
-        await self.db.flush()
+        return result.scalar_one()
+    
+    async def save_assistant_message(self, chat_session_id: UUID, content: str) -> Message:
+        """Persist the assistant's reply for a session in its own short transaction."""
+        with stage_timer("save_assistant_message"):
+            async with self.session_factory() as db, db.begin():
+                assistant_msg = Message(
+                    chat_session_id=chat_session_id,
+                    role=MessageRole.ASSISTANT,
+                    content=content
+                )
+                db.add(assistant_msg)
+                version = await self._bump_version(db, chat_session_id)
+        
+        self.session_cache.append(chat_session_id, version, assistant_msg)
+        count_cache.invalidate(("messages", chat_session_id))
+        
+        return assistant_msg
+    
+    async def complete(
+        self,
+        project: Project,
+        messages: list[dict[str, str]],
+        prefix: SystemPrefix | None = None,
+    ) -> str:
+        """
+        Get the LLM's reply for a turn, from the caches when allowed.
+        
+        The exact-match response cache is checked first, then (for projects
+        that opted in, on first turns) the semantic cache. A hit in either
+        skips the provider call entirely. On a miss, concurrent identical
+        requests share one provider call; each caller still saves its own
+        assistant message. `prefix`, the system prefix `messages` were built
+        from, lets cache keys use its hash instead of re-serializing it.
+        """
+        cache = self.response_cache
+        if cache is not None and not cache.allowed(self.llm_provider, project):
+            cache = None
+        
+        semantic = self.semantic_cache
+        if semantic is not None and not (project.semantic_cache_enabled and semantic.applies(messages)):
+            semantic = None
+        
+        description = self.llm_provider.describe()
+        key = canonical_key(description, messages, prefix)
+        
+        if cache is not None:
+            cached = await cache.get(key)
+            if cached is not None:
+                return cached
         
-        # Generate response from LLM
-        try:
-            assistant_content = await self.llm_provider.generate(messages)
-        except Exception as e:
-            # Log error and provide fallback response
-            assistant_content = f"I apologize, but I encountered an error: {str(e)}"
+        if semantic is not None:
+            scope = semantic.scope(description, messages, prefix)
+            question = messages[-1]["content"]
+            cached = await semantic.lookup(project.id, scope, question)
+            if cached is not None:
+                return cached
+        
+        async def generate() -> str:
+            content = await self.llm_provider.generate(messages)
+            if cache is not None:
+                await cache.set(key, content)
+            if semantic is not None:
+                semantic.store(project.id, scope, question, content)
+            return content
+        
+        if self.single_flight is None:
+            return await generate()
+        return await self.single_flight.do(key, generate)
+    
+    async def discard_turn(self, chat_session_id: UUID, user_message_id: UUID) -> None:
+        """
+        Undo prepare_turn when the turn can't be served (e.g. rate limited).
+        
+        Deletes the user message, and the session too if that leaves it empty,
+        so a client retry doesn't see the message twice.
+        """
+        async with self.session_factory() as db, db.begin():
+            await db.execute(delete(Message).where(Message.id == user_message_id))
+            await db.execute(
+                delete(ChatSession)
+                .where(ChatSession.id == chat_session_id)
+                .where(~exists().where(Message.chat_session_id == chat_session_id))
+            )
+            await db.execute(
+                update(ChatSession)
+                .where(ChatSession.id == chat_session_id)
+                .values(version=ChatSession.version + 1)
+            )
+        
+        self.session_cache.invalidate(chat_session_id)
+        count_cache.invalidate(("messages", chat_session_id))
+    
+    async def generate_response(
+        self,
+        project_id: UUID,
+        user_id: UUID,
+        user_message: str,
+        session_id: UUID | None = None
+    ) -> tuple[ChatSession, Message, Message]:
+        """
+        Generate a response from the LLM.
+        
+        Returns:
+            Tuple of (chat_session, user_message, assistant_message)
+        
+        Raises:
+            ValueError: If the project doesn't exist or isn't owned by the user
+            RateLimitError: If the provider stayed rate limited; nothing is persisted
+        """
+        with llm_deadline(self.deadline_seconds):
+            project, prefix, chat_session, user_msg, messages = await self._prepare_turn(
+                project_id, user_id, user_message, session_id
+            )
+            
+            # Generate response from LLM (no database connection held here);
+            # retries stop at CHAT_DEADLINE_SECONDS from the start of the turn
+            try:
+                with stage_timer("llm"):
+                    assistant_content = await self.complete(project, messages, prefix)
+            except RateLimitError:
+                await self.discard_turn(chat_session.id, user_msg.id)
+                raise
+            except Exception as e:
+                # Log error and provide fallback response
+                assistant_content = f"I apologize, but I encountered an error: {str(e)}"
         
         # Save assistant message
-        assistant_msg = Message(
-            chat_session_id=chat_session.id,
-            role=MessageRole.ASSISTANT,
-            content=assistant_content
-        )
-        self.db.add(assistant_msg)
-        await self.db.flush()
+        assistant_msg = await self.save_assistant_message(chat_session.id, assistant_content)
         
         return chat_session, user_msg, assistant_msg
@@ -0,0 +1,152 @@
+import logging
+import math
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Iterable
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Per-message framing overhead in the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache
+def _get_encoding():
+    """tiktoken encoding if the optional package (and its BPE files) are available."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+    
+    Uses tiktoken when installed; otherwise estimates ~4 characters per
+    token, which is close enough for budgeting across model families.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(content: str) -> int:
+    """Tokens a message costs in the request, including framing overhead."""
+    return count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+class CountedMessages(list):
+    """
+    An LLM payload that carries its prompt token total.
+    
+    Built by ContextWindow, which has already counted every message, so
+    code further down (token metrics) doesn't tokenize the prompt again.
+    """
+    
+    def __init__(self, messages: Iterable[dict[str, str]], tokens: int):
+        super().__init__(messages)
+        self.tokens = tokens
+
+
+def prompt_tokens(messages: list[dict[str, str]]) -> int:
+    """Prompt tokens of a payload, counted only if it doesn't carry its total."""
+    if isinstance(messages, CountedMessages):
+        return messages.tokens
+    return sum(message_tokens(m["content"]) for m in messages)
+
+
+class ContextWindow:
+    """
+    Fits system prompts and chat history into a token budget.
+    
+    System prompts and the new user message are always sent; history is
+    filled in from the most recent turn backwards until the budget is spent.
+    Token counts of stored messages are cached by message id, since message
+    content never changes once persisted.
+    """
+    
+    def __init__(self, max_tokens: int, reserved_tokens: int, cache_size: int):
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.cache_size = cache_size
+        self._token_cache: OrderedDict[Hashable, int] = OrderedDict()
+    
+    @property
+    def budget(self) -> int:
+        """Prompt tokens available once the completion reservation is taken out."""
+        return max(self.max_tokens - self.reserved_tokens, 0)
+    
+    def cached_tokens(self, key: Hashable, content: str) -> int:
+        """Token count for a stored message, computed once per message id."""
+        tokens = self._token_cache.get(key)
+        
+        if tokens is None:
+            tokens = message_tokens(content)
+            self._token_cache[key] = tokens
+            if len(self._token_cache) > self.cache_size:
+                self._token_cache.popitem(last=False)
+        else:
+            self._token_cache.move_to_end(key)
+        
+        return tokens
+    
+    def build(
+        self,
+        system_messages: list[dict[str, str]],
+        history: Iterable[tuple[Hashable, str, str]],
+        user_message: str,
+    ) -> CountedMessages:
+        """
+        Assemble the LLM payload within the budget.
+        
+        Args:
+            system_messages: System prompt messages, always kept
+            history: (message_id, role, content) tuples, oldest first
+            user_message: The new user message, always kept
+            
+        Returns:
+            List of message dictionaries for the provider, with its token total
+        """
+        used = sum(message_tokens(m["content"]) for m in system_messages)
+        used += message_tokens(user_message)
+        
+        if used > self.budget:
+            logger.warning(
+                "System prompts and user message use %d tokens, over the %d token budget",
+                used,
+                self.budget,
+            )
+        
+        history = list(history)
+        kept: list[dict[str, str]] = []
+        
+        for key, role, content in reversed(history):
+            tokens = self.cached_tokens(key, content)
+            if used + tokens > self.budget:
+                break
+            used += tokens
+            kept.append({"role": role, "content": content})
+        
+        kept.reverse()
+        
+        # Don't open the window on an assistant reply whose question was cut off
+        if len(kept) < len(history) and kept and kept[0]["role"] == "assistant":
+            used -= message_tokens(kept.pop(0)["content"])
+        
+        return CountedMessages([*system_messages, *kept, {"role": "user", "content": user_message}], used)
+
+
+@lru_cache
+def get_context_window() -> ContextWindow:
+    """Process-wide context window, so the token cache is shared across requests."""
+    settings = get_settings()
+    return ContextWindow(
+        max_tokens=settings.LLM_CONTEXT_TOKENS,
+        reserved_tokens=settings.LLM_MAX_TOKENS,
+        cache_size=settings.LLM_CONTEXT_CACHE_SIZE,
+    )
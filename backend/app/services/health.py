@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.session import engine as default_engine, pool_stats
+from app.services.llm.registry import LLMProviderRegistry, ProviderUnavailableError
+from app.services.llm.router import RoutingProvider
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeResult:
+    """Outcome of one probe run, kept until the next run replaces it."""
+    
+    __slots__ = ("ok", "latency_ms", "error", "checked_at")
+    
+    def __init__(self, ok: bool, latency_ms: float, error: str | None = None):
+        self.ok = ok
+        self.latency_ms = latency_ms
+        self.error = error
+        self.checked_at = time.monotonic()
+    
+    def to_dict(self, max_age: float) -> dict[str, Any]:
+        """The result as reported by the probes; older than `max_age` counts as failed."""
+        age = time.monotonic() - self.checked_at
+        stale = age > max_age
+        return {
+            "ok": self.ok and not stale,
+            "latency_ms": round(self.latency_ms, 1),
+            "age_s": round(age, 1),
+            "error": "probe result is stale" if stale else self.error,
+        }
+
+
+async def _run_probe(check: Callable[[], Awaitable[bool]], timeout: float) -> ProbeResult:
+    """Run `check` within `timeout`; False, a timeout or an exception is a failure."""
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(timeout):
+            ok = await check()
+        error = None if ok else "check failed"
+    except TimeoutError:
+        ok, error = False, f"timed out after {timeout:g}s"
+    except Exception as e:
+        ok, error = False, str(e) or type(e).__name__
+    return ProbeResult(ok, (time.perf_counter() - started) * 1000, error)
+
+
+class HealthMonitor:
+    """
+    Background health probes behind the liveness and readiness endpoints.
+    
+    The database and each LLM provider are probed on their own intervals
+    by background tasks, and the endpoints only read the latest results -
+    so probe traffic never reaches the database or the provider APIs per
+    poll. Provider probes (``validate_connection``, usually a model list
+    call) run much less often than database ones. Pool headroom and breaker
+    state are in-memory and read live.
+    
+    A result older than a few intervals counts as failed, so a stuck probe
+    loop makes the instance unready instead of freezing its last status.
+    """
+    
+    def __init__(
+        self,
+        registry: LLMProviderRegistry,
+        engine: AsyncEngine = default_engine,
+        database_interval: float = 5.0,
+        provider_interval: float = 30.0,
+        timeout: float = 2.0,
+        max_pool_saturation: float = 1.0,
+    ):
+        self.registry = registry
+        self.engine = engine
+        self.database_interval = database_interval
+        self.provider_interval = provider_interval
+        self.timeout = timeout
+        self.max_pool_saturation = max_pool_saturation
+        self.database: ProbeResult | None = None
+        self.providers: dict[str, ProbeResult] = {}
+        self._tasks: list[asyncio.Task] = []
+    
+    @classmethod
+    def from_settings(cls, registry: LLMProviderRegistry) -> "HealthMonitor":
+        settings = get_settings()
+        return cls(
+            registry,
+            database_interval=settings.HEALTH_DATABASE_INTERVAL,
+            provider_interval=settings.HEALTH_PROVIDER_INTERVAL,
+            timeout=settings.HEALTH_PROBE_TIMEOUT,
+            max_pool_saturation=settings.HEALTH_MAX_POOL_SATURATION,
+        )
+    
+    async def start(self) -> None:
+        """Run every probe once, then keep refreshing them in the background."""
+        await asyncio.gather(self.probe_database(), self.probe_providers())
+        self._tasks = [
+            asyncio.create_task(self._refresh(self.probe_database, self.database_interval)),
+            asyncio.create_task(self._refresh(self.probe_providers, self.provider_interval)),
+        ]
+    
+    async def _refresh(self, probe: Callable[[], Awaitable[None]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await probe()
+            except Exception:
+                logger.exception("Health probe %s failed", probe.__name__)
+    
+    async def probe_database(self) -> None:
+        """Check out a connection and run a trivial query."""
+        async def check() -> bool:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return True
+        
+        self.database = await _run_probe(check, self.timeout)
+        if not self.database.ok:
+            logger.warning("Database health probe failed: %s", self.database.error)
+    
+    async def probe_providers(self) -> None:
+        """
+        Validate each provider's connection concurrently.
+        
+        A router isn't probed itself; its status is derived from its backends,
+        which are registered (and probed) under their own names.
+        """
+        names = []
+        for name in self.registry.names():
+            if not isinstance(self.registry.get(name), RoutingProvider):
+                names.append(name)
+        
+        results = await asyncio.gather(
+            *(_run_probe(self.registry.get(name).validate_connection, self.timeout) for name in names)
+        )
+        
+        for name, result in zip(names, results):
+            if not result.ok:
+                logger.warning("LLM provider %r health probe failed: %s", name, result.error)
+        self.providers = dict(zip(names, results))
+    
+    def _provider_status(self, name: str, circuits: dict[str, str]) -> dict[str, Any]:
+        """Reachability and breaker state of one provider, from the cached probes."""
+        max_age = 3 * self.provider_interval + self.timeout
+        
+        try:
+            provider = self.registry.get(name)
+        except (ValueError, ProviderUnavailableError) as e:
+            return {"ok": False, "error": str(e)}
+        
+        if isinstance(provider, RoutingProvider):
+            backends = {backend: self._provider_status(backend, circuits) for backend in provider.backends}
+            return {"ok": any(status["ok"] for status in backends.values()), "backends": backends}
+        
+        result = self.providers.get(name)
+        status = result.to_dict(max_age) if result else {"ok": False, "error": "not probed yet"}
+        circuit = circuits.get(name)
+        status["circuit"] = circuit
+        status["ok"] = status["ok"] and circuit != "open"
+        return status
+    
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """
+        Whether this instance should receive traffic, with the check details.
+        
+        Ready when the database answered its last probe, the connection pool
+        has headroom (not checked when its overflow is unlimited), and the default LLM provider is reachable with its
+        circuit not open (for a router, any of its backends). Other
+        providers are reported but don't affect readiness.
+        """
+        database = (
+            self.database.to_dict(3 * self.database_interval + self.timeout)
+            if self.database else {"ok": False, "error": "not probed yet"}
+        )
+        
+        # No saturation (None) with NullPool or unlimited overflow: nothing to exhaust
+        pool = pool_stats()
+        saturation = pool.get("saturation")
+        database_pool = {
+            "ok": saturation is None or saturation < self.max_pool_saturation,
+            "saturation": saturation,
+            "max_saturation": self.max_pool_saturation,
+        }
+        
+        circuits = self.registry.circuit_states()
+        default_name = self.registry.default_name
+        providers = {name: self._provider_status(name, circuits) for name in self.registry.names()}
+        if default_name not in providers:
+            providers[default_name] = self._provider_status(default_name, circuits)
+        
+        ready = database["ok"] and database_pool["ok"] and providers[default_name]["ok"]
+        return ready, {
+            "status": "ready" if ready else "unready",
+            "database": database,
+            "database_pool": database_pool,
+            "llm_default_provider": default_name,
+            "llm_providers": providers,
+        }
+    
+    async def aclose(self) -> None:
+        """Stop the background probes (on shutdown)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
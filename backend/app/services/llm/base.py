@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator
 
 
 class LLMProvider(ABC):
@@ -22,6 +22,25 @@ class LLMProvider(ABC):
         """
         pass
     
+    @abstractmethod
+    def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM as it is generated.
+        
+        Implementations are async generators.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            **kwargs: Additional provider-specific parameters
+            
+        Yields:
+            Response text deltas, in order
+            
+        Raises:
+            Exception: If generation fails
+        """
+        pass
+    
     @abstractmethod
     async def validate_connection(self) -> bool:
         """
@@ -31,3 +50,29 @@ class LLMProvider(ABC):
             True if connection is valid, False otherwise
         """
         pass
+    
+    async def aclose(self) -> None:
+        """Release long-lived resources (e.g. pooled HTTP clients) held by the provider."""
+        pass
+    
+    def pool_stats(self) -> dict[str, Any]:
+        """
+        Return connection pool statistics for the provider.
+        
+        Returns:
+            Dictionary of pool counters, empty if the provider has no pool
+        """
+        return {}
+    
+    def describe(self) -> dict[str, Any]:
+        """
+        Describe the model and default sampling parameters behind this provider.
+        
+        Used to key cached responses: providers with equal descriptions must
+        give interchangeable answers for the same messages.
+        
+        Returns:
+            Dictionary with at least "provider"; "model", "temperature" and
+            "max_tokens" when known
+        """
+        return {"provider": type(self).__name__}
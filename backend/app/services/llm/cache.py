@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.llm_cache import LLMResponseCacheEntry
+from app.models.project import Project
+from app.services.llm.base import LLMProvider
+from app.services.prompt_cache import SystemPrefix
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# The shared tier deletes expired rows once every this many writes
+PURGE_EVERY_WRITES = 500
+
+
+def canonical_key(
+    description: dict[str, Any],
+    messages: list[dict[str, str]],
+    prefix: SystemPrefix | None = None,
+) -> str:
+    """
+    Hash a request into a cache key.
+    
+    Covers the provider description (model and sampling parameters) and the
+    role/content of every message, serialized canonically (sorted keys, no
+    whitespace) so equal requests always hash the same. When `messages`
+    start with a project's compiled system `prefix`, its precomputed hash
+    stands in for those messages, so they aren't serialized again per turn.
+    """
+    if prefix is not None:
+        messages = messages[len(prefix.messages):]
+    
+    payload = json.dumps(
+        {
+            "llm": description,
+            "prefix": prefix.hash if prefix is not None else None,
+            "messages": [{"role": m["role"], "content": m["content"]} for m in messages],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheTier(ABC):
+    """One storage tier of the response cache."""
+    
+    name: str = "tier"
+    
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+    
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        """Return the cached response, None on a miss."""
+        pass
+    
+    @abstractmethod
+    async def set(self, key: str, response: str) -> None:
+        """Store a response."""
+        pass
+    
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryCacheTier(CacheTier):
+    """Per-process LRU with a TTL and a total size bound (bytes of cached strings)."""
+    
+    name = "memory"
+    
+    def __init__(self, ttl: float, max_bytes: int):
+        super().__init__()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, str, int]] = OrderedDict()
+    
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    async def set(self, key: str, response: str) -> None:
+        size = sys.getsizeof(key) + sys.getsizeof(response)
+        if size > self.max_bytes:
+            return
+        
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, response, size)
+        self.bytes += size
+        
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+    
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class DatabaseCacheTier(CacheTier):
+    """
+    Shared tier in the ``llm_response_cache`` table, visible to every worker.
+    
+    Database errors are logged and treated as misses: the cache must never
+    fail a chat turn.
+    """
+    
+    name = "database"
+    
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], ttl: float):
+        super().__init__()
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.errors = 0
+        self._writes = 0
+    
+    async def get(self, key: str) -> str | None:
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(LLMResponseCacheEntry.response)
+                    .where(LLMResponseCacheEntry.key == key)
+                    .where(LLMResponseCacheEntry.expires_at > datetime.utcnow())
+                )
+                response = result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            self.errors += 1
+            response = None
+        
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+    
+    async def set(self, key: str, response: str) -> None:
+        now = datetime.utcnow()
+        values = {
+            "key": key,
+            "response": response,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl),
+        }
+        
+        try:
+            async with self.session_factory() as db, db.begin():
+                dialect = db.get_bind().dialect.name
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                
+                stmt = insert(LLMResponseCacheEntry).values(**values)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[LLMResponseCacheEntry.key],
+                    set_={k: stmt.excluded[k] for k in ("response", "created_at", "expires_at")},
+                ))
+                
+                self._writes += 1
+                if self._writes % PURGE_EVERY_WRITES == 0:
+                    await db.execute(
+                        delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.expires_at <= now)
+                    )
+        except Exception as e:
+            logger.warning("Response cache write failed: %s", e)
+            self.errors += 1
+    
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "errors": self.errors}
+
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM responses, checked before calling the provider.
+    
+    Keys are canonical hashes of the provider description and the full
+    message list. Responses are only cached when the provider samples
+    deterministically (temperature 0) or the project opted in. Tiers are
+    read in order; a hit in a lower tier is copied into the ones above it.
+    """
+    
+    def __init__(self, tiers: list[CacheTier]):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def allowed(provider: LLMProvider, project: Project) -> bool:
+        """Whether responses for this provider/project may be cached."""
+        return project.response_cache_enabled or provider.describe().get("temperature") == 0
+    
+    @staticmethod
+    def key(provider: LLMProvider, messages: list[dict[str, str]]) -> str:
+        return canonical_key(provider.describe(), messages)
+    
+    async def get(self, key: str) -> str | None:
+        for index, tier in enumerate(self.tiers):
+            response = await tier.get(key)
+            if response is not None:
+                for upper in self.tiers[:index]:
+                    await upper.set(key, response)
+                self.hits += 1
+                return response
+        
+        self.misses += 1
+        return None
+    
+    async def set(self, key: str, response: str) -> None:
+        for tier in self.tiers:
+            await tier.set(key, response)
+    
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "tiers": {tier.name: tier.stats() for tier in self.tiers},
+        }
+
+
+def create_response_cache(session_factory: async_sessionmaker[AsyncSession]) -> ResponseCache | None:
+    """Build the response cache from settings, None if it's disabled."""
+    settings = get_settings()
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    
+    tiers: list[CacheTier] = [MemoryCacheTier(settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_BYTES)]
+    if settings.LLM_CACHE_SHARED:
+        tiers.append(DatabaseCacheTier(session_factory, settings.LLM_CACHE_TTL))
+    
+    return ResponseCache(tiers)
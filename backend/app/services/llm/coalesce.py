@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One in-flight upstream call and the number of callers waiting on it."""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+    
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs wait on the same task (through ``asyncio.shield``, so one
+    caller being cancelled doesn't cancel it for the others) and get the
+    same result or exception. The task is only cancelled once every waiter
+    has gone away. Results aren't kept after the call finishes - that's the
+    response cache's job.
+    
+    The task runs in the first caller's context, so its ``llm_deadline``
+    bounds the shared call.
+    """
+    
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn()``, or join the call already running under ``key``."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller was cancelled: nobody wants the answer any more
+                self.abandoned += 1
+                self._forget(key, flight)
+                flight.task.cancel()
+    
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+    
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
+
+
+def create_single_flight() -> SingleFlight | None:
+    """Build the request coalescer, None if it's disabled."""
+    if not get_settings().LLM_COALESCE_ENABLED:
+        return None
+    return SingleFlight()
@@ -0,0 +1,25 @@
+from app.services.llm.base import LLMProvider
+from app.services.llm.openai import OpenAIProvider
+from app.services.llm.openrouter import OpenRouterProvider
+from app.services.llm.groq import GroqProvider
+from app.services.llm.mock import MockProvider
+
+
+def create_llm_provider(kind: str, model: str | None = None) -> LLMProvider:
+    """
+    Create an LLM provider instance.
+    
+    Args:
+        kind: Provider type ("openai", "openrouter", "groq" or "mock")
+        model: Model override, defaults to the LLM_MODEL setting
+    """
+    if kind == "openai":
+        return OpenAIProvider(model=model)
+    elif kind == "openrouter":
+        return OpenRouterProvider(model=model)
+    elif kind == "groq":
+        return GroqProvider(model=model)
+    elif kind == "mock":
+        return MockProvider.from_settings(model=model)
+    else:
+        raise ValueError(f"Unknown LLM provider: {kind}")
@@ -0,0 +1,94 @@
+import importlib.util
+import json
+from typing import Any, AsyncIterator
+import httpx
+
+from app.core.config import get_settings
+from app.services.llm.ratelimit import RateLimitedTransport, RateLimiter
+
+# HTTP/2 needs the optional h2 package; without it we stay on HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def create_http_client(base_url: str = "", headers: dict[str, str] | None = None) -> httpx.AsyncClient:
+    """
+    Create a long-lived, pooled HTTP client for an LLM provider.
+    
+    The client is meant to be created once at startup and reused for every
+    request so connections (and their TLS sessions) are kept alive between
+    chat turns. Call ``aclose()`` on shutdown.
+    
+    Every request goes through the client's own RateLimiter, so each
+    provider paces itself against its RPM / TPM budget and 429s.
+    """
+    settings = get_settings()
+    
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+    )
+    
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=5.0),
+        transport=RateLimitedTransport(transport, RateLimiter.from_settings()),
+    )
+
+
+def http_pool_stats(client: httpx.AsyncClient) -> dict[str, Any]:
+    """Return a snapshot of the client's connection pool, for sizing the limits."""
+    settings = get_settings()
+    
+    transport = client._transport
+    limiter = None
+    if isinstance(transport, RateLimitedTransport):
+        limiter = transport.limiter
+        transport = transport.transport
+    
+    # httpx doesn't expose its pool publicly; the httpcore pool sits on the transport
+    pool = getattr(transport, "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    
+    stats = {
+        "max_connections": settings.LLM_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "connections": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        "http2": settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+        "closed": client.is_closed,
+    }
+    if limiter is not None:
+        stats["rate_limit"] = limiter.stats()
+    
+    return stats
+
+
+async def iter_completion_deltas(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Parse an OpenAI-compatible ``stream=true`` response into content deltas.
+    
+    The body is a Server-Sent-Events stream of ``data: {chunk}`` lines
+    terminated by ``data: [DONE]``.
+    """
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        
+        choices = json.loads(data).get("choices") or []
+        if not choices:
+            continue
+        
+        content = (choices[0].get("delta") or {}).get("content")
+        if content:
+            yield content
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+from typing import Any, AsyncIterator
+
+from app.services.llm.base import LLMProvider
+from app.services.llm.ratelimit import RateLimitError
+from app.core.config import get_settings
+
+LATENCY_DISTRIBUTIONS = ("fixed", "normal", "longtail")
+
+# Words the deterministic replies are drawn from
+_WORDS = (
+    "the a service order account request support team update answer question help "
+    "system project message result time issue customer product please thanks check "
+    "available review details process option change status information provide next"
+).split()
+
+
+class MockProvider(LLMProvider):
+    """
+    Offline LLM stand-in for load tests and development.
+    
+    Replies are deterministic: the same messages always produce the same
+    text, derived from a hash of their content. Timing and failures are
+    simulated:
+    
+    - time to first token is drawn from a latency distribution: ``fixed``,
+      ``normal`` (stddev = ``latency_spread`` x latency) or ``longtail``
+      (log-normal with median ``latency`` and sigma ``latency_spread``)
+    - tokens then arrive at ``tokens_per_second``; ``generate`` waits for all
+      of them, ``generate_stream`` yields them as they "arrive"
+    - ``rate_limit_rate`` of calls fail at once with a RateLimitError, and
+      ``error_rate`` fail with a server error after the first-token latency
+    
+    Timing and failure draws come from a seeded RNG, so a run's sequence
+    is reproducible too. ``describe`` reports the configured temperature
+    (not 0), so the response cache treats the mock like the provider it
+    stands in for.
+    """
+    
+    def __init__(
+        self,
+        model: str = "mock",
+        temperature: float = 0.7,
+        latency: float = 0.2,
+        latency_distribution: str = "fixed",
+        latency_spread: float = 0.5,
+        tokens_per_second: float = 50.0,
+        response_tokens: int = 64,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown mock latency distribution {latency_distribution!r}, "
+                f"expected one of {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+        
+        self.model = model
+        self.temperature = temperature
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.latency_spread = latency_spread
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+    
+    @classmethod
+    def from_settings(cls, model: str | None = None) -> "MockProvider":
+        settings = get_settings()
+        return cls(
+            model=model or "mock",
+            temperature=settings.LLM_TEMPERATURE,
+            latency=settings.MOCK_LLM_LATENCY,
+            latency_distribution=settings.MOCK_LLM_LATENCY_DISTRIBUTION,
+            latency_spread=settings.MOCK_LLM_LATENCY_SPREAD,
+            tokens_per_second=settings.MOCK_LLM_TOKENS_PER_SECOND,
+            response_tokens=settings.MOCK_LLM_RESPONSE_TOKENS,
+            error_rate=settings.MOCK_LLM_ERROR_RATE,
+            rate_limit_rate=settings.MOCK_LLM_RATE_LIMIT_RATE,
+            seed=settings.MOCK_LLM_SEED,
+        )
+    
+    def first_token_latency(self) -> float:
+        """Draw one time-to-first-token, in seconds."""
+        if self.latency_distribution == "normal":
+            return max(0.0, self.random.gauss(self.latency, self.latency * self.latency_spread))
+        if self.latency_distribution == "longtail":
+            if self.latency <= 0:
+                return 0.0
+            return self.random.lognormvariate(math.log(self.latency), self.latency_spread)
+        return self.latency
+    
+    def reply_tokens(self, messages: list[dict[str, str]], max_tokens: int | None = None) -> list[str]:
+        """The deterministic reply to `messages`, as word tokens (with their leading space)."""
+        digest = hashlib.sha256(
+            json.dumps(
+                [[m["role"], m["content"]] for m in messages],
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        ).digest()
+        rng = random.Random(digest)
+        
+        count = self.response_tokens if max_tokens is None else min(self.response_tokens, max_tokens)
+        words = [rng.choice(_WORDS) for _ in range(count)]
+        if words:
+            words[0] = words[0].capitalize()
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+    
+    async def _start(self) -> None:
+        """Fail or wait out the first-token latency, as configured."""
+        self.calls += 1
+        draw = self.random.random()
+        
+        if draw < self.rate_limit_rate:
+            self.rate_limited += 1
+            raise RateLimitError("Mock rate limit exceeded", retry_after=self.retry_after)
+        
+        await asyncio.sleep(self.first_token_latency())
+        
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            raise Exception("Mock LLM error: simulated upstream failure")
+    
+    async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
+        """
+        Return the deterministic reply after the simulated latency.
+        
+        Raises:
+            RateLimitError: For a simulated 429
+            Exception: For a simulated upstream failure
+        """
+        await self._start()
+        tokens = self.reply_tokens(messages, kwargs.get("max_tokens"))
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(len(tokens) / self.tokens_per_second)
+        return "".join(tokens)
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream the deterministic reply one token at a time, at the configured token rate.
+        
+        Raises:
+            RateLimitError: For a simulated 429
+            Exception: For a simulated upstream failure
+        """
+        await self._start()
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, token in enumerate(self.reply_tokens(messages, kwargs.get("max_tokens"))):
+            if i and interval:
+                await asyncio.sleep(interval)
+            yield token
+    
+    async def validate_connection(self) -> bool:
+        return True
+    
+    def pool_stats(self) -> dict[str, Any]:
+        """Call and injected-failure counters (there is no connection pool)."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+        }
+    
+    def describe(self) -> dict[str, Any]:
+        """Model and default sampling parameters, for keying cached responses."""
+        return {
+            "provider": "mock",
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.response_tokens,
+        }
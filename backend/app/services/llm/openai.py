@@ -1,26 +1,41 @@
 import asyncio
-from typing import Any
+from typing import Any, AsyncIterator
 import httpx
-from openai import AsyncOpenAI, OpenAIError, APITimeoutError
+from openai import (
+    AsyncOpenAI,
+    OpenAIError,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    RateLimitError as OpenAIRateLimitError,
+)
 
 from app.services.llm.base import LLMProvider
+from app.services.llm.http import create_http_client, http_pool_stats
+from app.services.llm.ratelimit import RateLimitError, parse_retry_after
+from app.services.llm.resilience import LLMClientError
 from app.core.config import get_settings
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI LLM provider implementation."""
     
-    def __init__(self):
+    def __init__(self, model: str | None = None):
         settings = get_settings()
         
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is required for OpenAI provider")
         
+        # Share the same pool sizing and rate limiting as the other providers;
+        # 429 retries are left to the client's rate limiter, not the SDK
+        self.http_client = create_http_client()
         self.client = AsyncOpenAI(
             api_key=settings.OPENAI_API_KEY,
             timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=5.0),
+            http_client=self.http_client,
+            max_retries=0,
         )
-        self.model = settings.LLM_MODEL
+        self.model = model or settings.LLM_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
     
@@ -36,6 +51,8 @@ class OpenAIProvider(LLMProvider):
             Generated response text
             
         Raises:
+            RateLimitError: If the rate limit can't be met within LLM_RATE_LIMIT_MAX_WAIT
+            LLMClientError: If the request was rejected (4xx)
             Exception: If API call fails
         """
         try:
@@ -55,6 +72,74 @@ class OpenAIProvider(LLMProvider):
             
         except APITimeoutError as e:
             raise Exception(f"OpenAI API timeout: {str(e)}")
+        except OpenAIRateLimitError as e:
+            raise RateLimitError(
+                f"OpenAI rate limit exceeded: {str(e)}",
+                retry_after=parse_retry_after(e.response.headers),
+            )
+        except APIStatusError as e:
+            if 400 <= e.status_code < 500:
+                raise LLMClientError(f"OpenAI API error: {str(e)}")
+            raise Exception(f"OpenAI API error: {str(e)}")
+        except APIConnectionError as e:
+            # The SDK wraps transport errors; unwrap our rate limiter's rejection
+            if isinstance(e.__cause__, RateLimitError):
+                raise e.__cause__
+            raise Exception(f"OpenAI API error: {str(e)}")
+        except (RateLimitError, LLMClientError):
+            raise
+        except OpenAIError as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Unexpected error calling OpenAI: {str(e)}")
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream a response from OpenAI's API token by token.
+        
+        Args:
+            messages: List of message dictionaries
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+            
+        Yields:
+            Response text deltas as they arrive
+            
+        Raises:
+            RateLimitError: If the rate limit can't be met within LLM_RATE_LIMIT_MAX_WAIT
+            LLMClientError: If the request was rejected (4xx)
+            Exception: If API call fails
+        """
+        try:
+            stream = await self.client.chat.completions.create(
+                model=kwargs.get("model", self.model),
+                messages=messages,
+                temperature=kwargs.get("temperature", self.temperature),
+                max_tokens=kwargs.get("max_tokens", self.max_tokens),
+                stream=True,
+            )
+            
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except APITimeoutError as e:
+            raise Exception(f"OpenAI API timeout: {str(e)}")
+        except OpenAIRateLimitError as e:
+            raise RateLimitError(
+                f"OpenAI rate limit exceeded: {str(e)}",
+                retry_after=parse_retry_after(e.response.headers),
+            )
+        except APIStatusError as e:
+            if 400 <= e.status_code < 500:
+                raise LLMClientError(f"OpenAI API error: {str(e)}")
+            raise Exception(f"OpenAI API error: {str(e)}")
+        except APIConnectionError as e:
+            # The SDK wraps transport errors; unwrap our rate limiter's rejection
+            if isinstance(e.__cause__, RateLimitError):
+                raise e.__cause__
+            raise Exception(f"OpenAI API error: {str(e)}")
+        except (RateLimitError, LLMClientError):
+            raise
         except OpenAIError as e:
             raise Exception(f"OpenAI API error: {str(e)}")
         except Exception as e:
@@ -68,3 +153,20 @@ class OpenAIProvider(LLMProvider):
             return True
         except Exception:
             return False
+    
+    async def aclose(self) -> None:
+        """Close the underlying pooled HTTP client."""
+        await self.client.close()
+    
+    def pool_stats(self) -> dict[str, Any]:
+        """Return connection pool statistics for the OpenAI client."""
+        return http_pool_stats(self.http_client)
+    
+    def describe(self) -> dict[str, Any]:
+        """Model and default sampling parameters, for keying cached responses."""
+        return {
+            "provider": "openai",
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
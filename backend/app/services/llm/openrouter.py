@@ -1,26 +1,39 @@
 import asyncio
-from typing import Any
+from typing import Any, AsyncIterator
 import httpx
 
 from app.services.llm.base import LLMProvider
+from app.services.llm.http import create_http_client, http_pool_stats, iter_completion_deltas
+from app.services.llm.ratelimit import RateLimitError, parse_retry_after
+from app.services.llm.resilience import LLMClientError
 from app.core.config import get_settings
 
 
 class OpenRouterProvider(LLMProvider):
     """OpenRouter LLM provider implementation."""
     
-    def __init__(self):
+    def __init__(self, model: str | None = None):
         settings = get_settings()
         
         if not settings.OPENROUTER_API_KEY:
             raise ValueError("OPENROUTER_API_KEY is required for OpenRouter provider")
         
         self.api_key = settings.OPENROUTER_API_KEY
-        self.base_url = "https://openrouter.ai/api/v1"
-        self.model = settings.LLM_MODEL
+        self.base_url = settings.OPENROUTER_BASE_URL
+        self.model = model or settings.LLM_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
         self.timeout = settings.LLM_TIMEOUT
+        
+        # Long-lived pooled client, reused across requests (closed via aclose())
+        self.client = create_http_client(
+            self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "HTTP-Referer": "https://chatbot-platform.local",
+                "X-Title": "Chatbot Platform",
+            },
+        )
     
     async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
         """
@@ -34,6 +47,8 @@ class OpenRouterProvider(LLMProvider):
             Generated response text
             
         Raises:
+            RateLimitError: If the rate limit can't be met within LLM_RATE_LIMIT_MAX_WAIT
+            LLMClientError: If the request was rejected (4xx)
             Exception: If API call fails
         """
         try:
@@ -42,13 +57,6 @@ class OpenRouterProvider(LLMProvider):
             max_tokens = kwargs.get("max_tokens", self.max_tokens)
             model = kwargs.get("model", self.model)
             
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://chatbot-platform.local",
-                "X-Title": "Chatbot Platform",
-            }
-            
             payload = {
                 "model": model,
                 "messages": messages,
@@ -56,21 +64,75 @@ class OpenRouterProvider(LLMProvider):
                 "max_tokens": max_tokens,
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload,
+            response = await self.client.post("/chat/completions", json=payload)
+            response.raise_for_status()
+            
+            data = response.json()
+            return data["choices"][0]["message"]["content"] or ""
+                
+        except httpx.TimeoutException as e:
+            raise Exception(f"OpenRouter API timeout: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                raise RateLimitError(
+                    f"OpenRouter rate limit exceeded: {e.response.text}",
+                    retry_after=parse_retry_after(e.response.headers),
                 )
+            if e.response.is_client_error:
+                raise LLMClientError(f"OpenRouter API error: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"OpenRouter API error: {e.response.status_code} - {e.response.text}")
+        except (RateLimitError, LLMClientError):
+            raise
+        except Exception as e:
+            raise Exception(f"Unexpected error calling OpenRouter: {str(e)}")
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream a response from OpenRouter's API token by token.
+        
+        Args:
+            messages: List of message dictionaries
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+            
+        Yields:
+            Response text deltas as they arrive
+            
+        Raises:
+            RateLimitError: If the rate limit can't be met within LLM_RATE_LIMIT_MAX_WAIT
+            LLMClientError: If the request was rejected (4xx)
+            Exception: If API call fails
+        """
+        try:
+            payload = {
+                "model": kwargs.get("model", self.model),
+                "messages": messages,
+                "temperature": kwargs.get("temperature", self.temperature),
+                "max_tokens": kwargs.get("max_tokens", self.max_tokens),
+                "stream": True,
+            }
+            
+            async with self.client.stream("POST", "/chat/completions", json=payload) as response:
+                if response.is_error:
+                    # Error bodies are not streamed; read them so the message is available
+                    await response.aread()
                 response.raise_for_status()
                 
-                data = response.json()
-                return data["choices"][0]["message"]["content"] or ""
+                async for delta in iter_completion_deltas(response):
+                    yield delta
                 
         except httpx.TimeoutException as e:
             raise Exception(f"OpenRouter API timeout: {str(e)}")
         except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                raise RateLimitError(
+                    f"OpenRouter rate limit exceeded: {e.response.text}",
+                    retry_after=parse_retry_after(e.response.headers),
+                )
+            if e.response.is_client_error:
+                raise LLMClientError(f"OpenRouter API error: {e.response.status_code} - {e.response.text}")
             raise Exception(f"OpenRouter API error: {e.response.status_code} - {e.response.text}")
+        except (RateLimitError, LLMClientError):
+            raise
         except Exception as e:
             raise Exception(f"Unexpected error calling OpenRouter: {str(e)}")
     
@@ -78,16 +140,25 @@ class OpenRouterProvider(LLMProvider):
         """Validate OpenRouter API connection."""
         try:
             # Make a minimal API call to verify connection
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-            }
-            
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/models",
-                    headers=headers,
-                )
-                response.raise_for_status()
-                return True
+            response = await self.client.get("/models", timeout=5.0)
+            response.raise_for_status()
+            return True
         except Exception:
             return False
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self.client.aclose()
+    
+    def pool_stats(self) -> dict[str, Any]:
+        """Return connection pool statistics for the OpenRouter client."""
+        return http_pool_stats(self.client)
+    
+    def describe(self) -> dict[str, Any]:
+        """Model and default sampling parameters, for keying cached responses."""
+        return {
+            "provider": "openrouter",
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import logging
+import math
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+import httpx
+
+from app.core.config import get_settings
+from app.services.context import message_tokens
+
+logger = logging.getLogger(__name__)
+
+# "1.5", "20ms", "6m0s", "2m59.56s", "1h2m3s"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class RateLimitError(Exception):
+    """The provider's rate limit could not be met within LLM_RATE_LIMIT_MAX_WAIT."""
+    
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_reset(value: str | None) -> float | None:
+    """
+    Parse a rate-limit reset header into seconds from now.
+    
+    Accepts plain seconds, Go-style durations (OpenAI / Groq ``x-ratelimit-reset-*``),
+    unix timestamps in seconds or milliseconds (OpenRouter ``X-RateLimit-Reset``)
+    and HTTP dates (``Retry-After``).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    
+    try:
+        number = float(value)
+    except ValueError:
+        pass
+    else:
+        if number > 1e12:
+            return max(0.0, number / 1000 - time.time())
+        if number > 1e9:
+            return max(0.0, number - time.time())
+        return max(0.0, number)
+    
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+        return sum(float(n) * scale[u] for n, u in parts)
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait after a 429, from Retry-After or the reset headers."""
+    for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens", "x-ratelimit-reset"):
+        seconds = parse_reset(headers.get(name))
+        if seconds is not None:
+            return seconds
+    return None
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> float | None:
+    try:
+        return float(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class _Budget:
+    """
+    One per-minute budget (requests or tokens).
+    
+    Combines an optional local token bucket (the configured per-minute quota)
+    with the provider's own view: the last reported remaining amount, valid
+    until its reset time.
+    """
+    
+    def __init__(self, per_minute: int | None):
+        self.per_minute = per_minute
+        self.level = float(per_minute or 0)
+        self.updated = time.monotonic()
+        self.remaining: float | None = None
+        self.reset_at = 0.0
+    
+    def _refill(self, now: float) -> None:
+        if self.per_minute:
+            self.level = min(
+                float(self.per_minute),
+                self.level + (now - self.updated) * self.per_minute / 60,
+            )
+        self.updated = now
+        
+        if self.remaining is not None and now >= self.reset_at:
+            self.remaining = None
+    
+    def wait_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` fits the budget (0 if it fits now)."""
+        self._refill(now)
+        wait = 0.0
+        
+        if self.per_minute:
+            # A single request larger than the whole quota only waits for a full bucket
+            needed = min(amount, self.per_minute)
+            if self.level < needed:
+                wait = (needed - self.level) * 60 / self.per_minute
+        
+        if self.remaining is not None and self.remaining < amount:
+            wait = max(wait, self.reset_at - now)
+        
+        return wait
+    
+    def consume(self, amount: float) -> None:
+        if self.per_minute:
+            self.level -= min(amount, self.per_minute)
+        if self.remaining is not None:
+            self.remaining -= amount
+    
+    def sync(self, remaining: float | None, reset_after: float | None, now: float) -> None:
+        """Adopt the provider's reported remaining budget."""
+        if remaining is None:
+            return
+        self.remaining = remaining
+        self.reset_at = now + (reset_after if reset_after is not None else 60.0)
+
+
+class RateLimiter:
+    """
+    Per-provider scheduler for requests-per-minute and tokens-per-minute budgets.
+    
+    Callers are queued FIFO and paced so they fit both budgets and any
+    ``Retry-After`` block from a previous 429, instead of being fired at the
+    provider and rejected. Budgets are corrected from the provider's
+    ``x-ratelimit-*`` headers on every response.
+    """
+    
+    def __init__(
+        self,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        max_wait: float = 10.0,
+        max_retries: int = 2,
+    ):
+        self.requests = _Budget(rpm)
+        self.tokens = _Budget(tpm)
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        
+        self.queued = 0
+        self.acquired = 0
+        self.waited_seconds_total = 0.0
+        self.throttled = 0
+        self.rejected = 0
+    
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        settings = get_settings()
+        return cls(
+            rpm=settings.LLM_RATE_LIMIT_RPM,
+            tpm=settings.LLM_RATE_LIMIT_TPM,
+            max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT,
+            max_retries=settings.LLM_RATE_LIMIT_MAX_RETRIES,
+        )
+    
+    def _wait_for(self, tokens: int, now: float) -> float:
+        return max(
+            self.blocked_until - now,
+            self.requests.wait_for(1, now),
+            self.tokens.wait_for(tokens, now),
+        )
+    
+    async def acquire(self, tokens: int, deadline: float) -> None:
+        """
+        Wait for a slot for one request costing `tokens`.
+        
+        Raises:
+            RateLimitError: If the slot isn't available before `deadline` (monotonic)
+        """
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout=max(0.0, deadline - started))
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise RateLimitError(
+                    "LLM rate limit queue is full",
+                    retry_after=self._wait_for(tokens, time.monotonic()) or 1.0,
+                )
+            
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_for(tokens, now)
+                    if wait <= 0:
+                        self.requests.consume(1)
+                        self.tokens.consume(tokens)
+                        break
+                    
+                    if now + wait > deadline:
+                        self.rejected += 1
+                        raise RateLimitError("LLM rate limit exceeded", retry_after=wait)
+                    
+                    await asyncio.sleep(wait)
+            finally:
+                self._lock.release()
+        finally:
+            self.queued -= 1
+        
+        self.acquired += 1
+        self.waited_seconds_total += time.monotonic() - started
+    
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync budgets with the provider's reported remaining requests / tokens."""
+        now = time.monotonic()
+        
+        # OpenAI / Groq style
+        self.requests.sync(
+            _header_float(headers, "x-ratelimit-remaining-requests"),
+            parse_reset(headers.get("x-ratelimit-reset-requests")),
+            now,
+        )
+        self.tokens.sync(
+            _header_float(headers, "x-ratelimit-remaining-tokens"),
+            parse_reset(headers.get("x-ratelimit-reset-tokens")),
+            now,
+        )
+        
+        # OpenRouter style (requests only)
+        self.requests.sync(
+            _header_float(headers, "x-ratelimit-remaining"),
+            parse_reset(headers.get("x-ratelimit-reset")),
+            now,
+        )
+    
+    def on_rate_limited(self, headers: Mapping[str, str]) -> float:
+        """Block new requests after a 429; returns the seconds to wait."""
+        retry_after = parse_retry_after(headers)
+        if retry_after is None:
+            retry_after = 1.0
+        
+        self.throttled += 1
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+        return retry_after
+    
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rpm": self.requests.per_minute,
+            "tpm": self.tokens.per_minute,
+            "queued": self.queued,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.waited_seconds_total / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+        }
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Tokens a chat completion request may consume: prompt plus the max_tokens reservation."""
+    if request.method != "POST":
+        return 0
+    
+    try:
+        payload = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        return 0
+    
+    prompt = sum(message_tokens(str(m.get("content") or "")) for m in payload.get("messages") or [])
+    return prompt + int(payload.get("max_tokens") or 0)
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that runs every request through a RateLimiter.
+    
+    A 429 blocks the limiter for its Retry-After and the request is re-sent
+    (up to ``max_retries`` times within ``max_wait``); after that the 429
+    response is returned to the caller.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: RateLimiter):
+        self.transport = transport
+        self.limiter = limiter
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = self.limiter
+        deadline = time.monotonic() + limiter.max_wait
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        
+        while True:
+            await limiter.acquire(tokens, deadline)
+            
+            response = await self.transport.handle_async_request(request)
+            limiter.update_from_headers(response.headers)
+            if response.status_code != 429:
+                return response
+            
+            retry_after = limiter.on_rate_limited(response.headers)
+            if attempt >= limiter.max_retries or time.monotonic() + retry_after > deadline:
+                return response
+            
+            logger.info("LLM provider returned 429, retrying in %.2fs", retry_after)
+            await response.aclose()
+            attempt += 1
+    
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def retry_after_header(retry_after: float | None) -> dict[str, str]:
+    """Retry-After response header for a RateLimitError."""
+    return {"Retry-After": str(math.ceil(retry_after if retry_after is not None else 1.0))}
@@ -0,0 +1,143 @@
+import logging
+from typing import Any
+
+from app.services.llm.base import LLMProvider
+from app.services.llm.factory import create_llm_provider
+from app.services.llm.router import RoutingProvider
+from app.services.llm.resilience import ResilientProvider
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Registry name of the RoutingProvider built from LLM_ROUTER_BACKENDS
+ROUTER_NAME = "router"
+
+
+class ProviderUnavailableError(Exception):
+    """Raised when a configured provider could not be initialized (e.g. missing API key)."""
+    pass
+
+
+def parse_provider_specs(spec: str) -> dict[str, tuple[str, str | None]]:
+    """
+    Parse the LLM_PROVIDERS setting.
+    
+    Format: comma-separated ``name=kind[:model]`` entries, e.g.
+    ``fast=groq:llama-3.1-8b-instant,smart=openai:gpt-4o-mini``.
+    
+    Returns:
+        Mapping of provider name to (kind, model)
+    """
+    entries: dict[str, tuple[str, str | None]] = {}
+    
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        
+        name, sep, target = item.partition("=")
+        if not sep or not name.strip() or not target.strip():
+            raise ValueError(f"Invalid LLM_PROVIDERS entry: {item!r}")
+        
+        kind, _, model = target.strip().partition(":")
+        entries[name.strip()] = (kind, model or None)
+    
+    return entries
+
+
+class LLMProviderRegistry:
+    """
+    Process-wide set of named LLM providers.
+    
+    Built once at startup (see ``main.lifespan``) so every request reuses
+    the same provider instances and their connection pools. Each provider
+    is wrapped in a ResilientProvider (retries + circuit breaker).
+    """
+    
+    def __init__(self, default_name: str):
+        self.default_name = default_name
+        self._providers: dict[str, LLMProvider] = {}
+        self._errors: dict[str, str] = {}
+    
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "LLMProviderRegistry":
+        """Build the registry from LLM_PROVIDER / LLM_PROVIDERS settings."""
+        settings = settings or get_settings()
+        
+        # The primary provider is always registered under its own name
+        specs = {settings.LLM_PROVIDER: (settings.LLM_PROVIDER, None)}
+        specs.update(parse_provider_specs(settings.LLM_PROVIDERS))
+        
+        registry = cls(default_name=settings.LLM_DEFAULT_PROVIDER or settings.LLM_PROVIDER)
+        
+        for name, (kind, model) in specs.items():
+            try:
+                registry.register(name, ResilientProvider.from_settings(create_llm_provider(kind, model)))
+            except ValueError as e:
+                # Missing API key etc. - keep serving, requests for it will report the error
+                logger.warning("LLM provider %r not initialized: %s", name, e)
+                registry._errors[name] = str(e)
+        
+        backend_names = [name.strip() for name in settings.LLM_ROUTER_BACKENDS.split(",") if name.strip()]
+        if backend_names:
+            registry._register_router(backend_names)
+        
+        return registry
+    
+    def _register_router(self, backend_names: list[str]) -> None:
+        """Register a RoutingProvider over the named (initialized) providers."""
+        backends = {}
+        for name in backend_names:
+            if name not in self._providers:
+                logger.warning("LLM router backend %r is not available, skipping it", name)
+                continue
+            backends[name] = self._providers[name]
+        
+        if not backends:
+            self._errors[ROUTER_NAME] = "No LLM router backends are available"
+            return
+        
+        self.register(ROUTER_NAME, RoutingProvider.from_settings(backends))
+    
+    def register(self, name: str, provider: LLMProvider) -> None:
+        """Register a provider under a name."""
+        self._providers[name] = provider
+        self._errors.pop(name, None)
+    
+    def get(self, name: str | None = None) -> LLMProvider:
+        """
+        Look up a provider by name, or the default provider.
+        
+        Raises:
+            ValueError: If no provider with that name is configured
+            ProviderUnavailableError: If the provider is configured but failed to initialize
+        """
+        name = name or self.default_name
+        
+        if name in self._providers:
+            return self._providers[name]
+        if name in self._errors:
+            raise ProviderUnavailableError(self._errors[name])
+        raise ValueError(f"Unknown LLM provider: {name}")
+    
+    def names(self) -> list[str]:
+        """Names of the successfully initialized providers."""
+        return list(self._providers)
+    
+    def circuit_states(self) -> dict[str, str]:
+        """Circuit breaker state per provider that has one."""
+        return {
+            name: provider.breaker.state
+            for name, provider in self._providers.items()
+            if isinstance(provider, ResilientProvider)
+        }
+    
+    def pool_stats(self) -> dict[str, dict[str, Any]]:
+        """Connection pool statistics per provider."""
+        return {name: provider.pool_stats() for name, provider in self._providers.items()}
+    
+    async def aclose(self) -> None:
+        """Close every registered provider."""
+        for provider in self._providers.values():
+            await provider.aclose()
@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator
+
+from app.services.llm.base import LLMProvider
+from app.services.llm.ratelimit import RateLimitError
+from app.core.config import get_settings
+from app.core.metrics import record_provider_error, record_tokens
+
+logger = logging.getLogger(__name__)
+
+# Monotonic time by which the current chat request must be answered
+_deadline: ContextVar[float | None] = ContextVar("llm_deadline", default=None)
+
+
+class LLMClientError(Exception):
+    """The provider rejected the request itself (4xx other than 429); retrying won't help."""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """The provider's circuit breaker is open, so the call was not attempted."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """The chat request's deadline passed before the provider answered."""
+    pass
+
+
+@contextmanager
+def llm_deadline(seconds: float | None) -> Iterator[None]:
+    """
+    Bound every LLM call made inside the block (including retries) by one deadline.
+    
+    Nested deadlines never extend an outer one. ``None`` leaves the current deadline as is.
+    """
+    if seconds is None:
+        yield
+        return
+    
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> float | None:
+    """Seconds until the current deadline, None if there is none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one provider.
+    
+    ``failure_threshold`` consecutive failures open the circuit: calls fail
+    immediately with CircuitOpenError for ``recovery_timeout`` seconds. Then
+    one probe call is let through (half-open); its success closes the circuit,
+    its failure re-opens it.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+    
+    def before_call(self) -> None:
+        """
+        Reserve permission for a call.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its probe in flight
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        
+        self.rejected += 1
+        retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError("LLM provider circuit is open", retry_after=retry_after)
+    
+    def record_success(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self._state = self.CLOSED
+    
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    "LLM circuit opened after %d consecutive failures", self.consecutive_failures
+                )
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+    
+    def release(self) -> None:
+        """Give back a reservation without a verdict (rate limited, cancelled, client error)."""
+        self._probe_in_flight = False
+    
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Wraps a provider with a circuit breaker and deadline-bounded retries.
+    
+    Failed calls are retried with full-jitter exponential backoff, but never
+    past the deadline set with ``llm_deadline`` (each attempt is also cut off
+    at it). Rate limits (paced by the HTTP client's RateLimiter) and client
+    errors are passed through untouched and don't count against the breaker.
+    Streams are only retried before their first delta.
+    
+    Failed attempts and the tokens of completed calls are exported as
+    Prometheus metrics under the wrapped provider's name.
+    """
+    
+    def __init__(
+        self,
+        provider: LLMProvider,
+        breaker: CircuitBreaker,
+        max_retries: int = 2,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+    ):
+        self.provider = provider
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.label = provider.describe().get("provider", type(provider).__name__)
+    
+    @classmethod
+    def from_settings(cls, provider: LLMProvider) -> "ResilientProvider":
+        settings = get_settings()
+        return cls(
+            provider,
+            CircuitBreaker(
+                failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=settings.LLM_BREAKER_RECOVERY_TIMEOUT,
+            ),
+            max_retries=settings.LLM_MAX_RETRIES,
+            base_delay=settings.LLM_RETRY_BASE_DELAY,
+            max_delay=settings.LLM_RETRY_MAX_DELAY,
+        )
+    
+    def _check_deadline(self) -> float | None:
+        remaining = time_left()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededError("Chat request deadline exceeded")
+        return remaining
+    
+    async def _backoff(self, attempt: int, error: Exception) -> None:
+        """Sleep before retry `attempt`, or re-raise `error` if it can't fit the deadline."""
+        if attempt >= self.max_retries:
+            raise error
+        
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        remaining = time_left()
+        if remaining is not None and delay >= remaining:
+            raise error
+        
+        self.retries += 1
+        logger.info("Retrying LLM call in %.2fs after: %s", delay, error)
+        await asyncio.sleep(delay)
+    
+    def _before_call(self) -> float | None:
+        """Deadline and breaker checks before an attempt; returns the time left."""
+        try:
+            remaining = self._check_deadline()
+            self.breaker.before_call()
+        except DeadlineExceededError:
+            record_provider_error(self.label, "deadline")
+            raise
+        except CircuitOpenError:
+            record_provider_error(self.label, "circuit_open")
+            raise
+        return remaining
+    
+    def _record_rejection(self, error: Exception) -> None:
+        record_provider_error(self.label, "rate_limited" if isinstance(error, RateLimitError) else "client_error")
+    
+    async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
+        """
+        Generate with retries, within the current deadline.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open (fails immediately)
+            DeadlineExceededError: If the deadline passes first
+            RateLimitError / LLMClientError: Passed through from the provider
+            Exception: If the last attempt failed
+        """
+        attempt = 0
+        while True:
+            remaining = self._before_call()
+            
+            try:
+                async with asyncio.timeout(remaining):
+                    result = await self.provider.generate(messages, **kwargs)
+            except (RateLimitError, LLMClientError) as e:
+                self.breaker.release()
+                self._record_rejection(e)
+                raise
+            except TimeoutError:
+                # Only the deadline's timeout can get here; provider timeouts are re-raised as Exception
+                self.breaker.record_failure()
+                record_provider_error(self.label, "deadline")
+                raise DeadlineExceededError("Chat request deadline exceeded")
+            except Exception as e:
+                self.breaker.record_failure()
+                record_provider_error(self.label, "error")
+                await self._backoff(attempt, e)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            
+            self.breaker.record_success()
+            record_tokens(self.label, messages, result)
+            return result
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream with retries before the first delta, within the current deadline.
+        
+        The deadline bounds the wait for the first delta; once text is flowing
+        the stream is left to finish.
+        """
+        attempt = 0
+        while True:
+            remaining = self._before_call()
+            
+            stream = self.provider.generate_stream(messages, **kwargs)
+            try:
+                async with asyncio.timeout(remaining):
+                    first = await anext(stream, None)
+            except (RateLimitError, LLMClientError) as e:
+                self.breaker.release()
+                self._record_rejection(e)
+                raise
+            except TimeoutError:
+                self.breaker.record_failure()
+                record_provider_error(self.label, "deadline")
+                await stream.aclose()
+                raise DeadlineExceededError("Chat request deadline exceeded")
+            except Exception as e:
+                self.breaker.record_failure()
+                record_provider_error(self.label, "error")
+                await self._backoff(attempt, e)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release()
+                await stream.aclose()
+                raise
+            
+            break
+        
+        parts: list[str] = []
+        try:
+            if first is not None:
+                parts.append(first)
+                yield first
+            async for delta in stream:
+                parts.append(delta)
+                yield delta
+        except Exception:
+            self.breaker.record_failure()
+            record_provider_error(self.label, "stream_error")
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        finally:
+            await stream.aclose()
+        
+        self.breaker.record_success()
+        record_tokens(self.label, messages, "".join(parts))
+    
+    async def validate_connection(self) -> bool:
+        return await self.provider.validate_connection()
+    
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+    
+    def describe(self) -> dict[str, Any]:
+        return self.provider.describe()
+    
+    def pool_stats(self) -> dict[str, Any]:
+        """The wrapped provider's pool statistics plus breaker state."""
+        return {
+            **self.provider.pool_stats(),
+            "circuit": self.breaker.stats(),
+            "retries": self.retries,
+        }
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+from app.services.llm.base import LLMProvider
+from app.services.llm.ratelimit import RateLimitError
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Samples a tracker needs before its p95 is trusted for hedging
+MIN_HEDGE_SAMPLES = 20
+
+
+class LatencyTracker:
+    """EWMA plus a window of recent samples (for percentiles) of one latency series."""
+    
+    def __init__(self, alpha: float, window: int = 200):
+        self.alpha = alpha
+        self.ewma: float | None = None
+        self.samples: deque[float] = deque(maxlen=window)
+    
+    def record(self, seconds: float) -> None:
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+        self.samples.append(seconds)
+    
+    def percentile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(q * (len(ordered) - 1))]
+
+
+class BackendStats:
+    """Rolling latency and error rate of one routed backend."""
+    
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.latency = LatencyTracker(alpha)  # Full generate() calls
+        self.ttft = LatencyTracker(alpha)  # Time to first streamed delta
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedge_wins = 0
+    
+    def record_success(self, tracker: LatencyTracker, seconds: float) -> None:
+        self.requests += 1
+        self.error_rate *= 1 - self.alpha
+        tracker.record(seconds)
+    
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+    
+    def score(self, tracker: LatencyTracker) -> float:
+        """Expected latency, inflated by the error rate; 0 for untried backends so they get sampled."""
+        if tracker.ewma is None:
+            return 0.0
+        return tracker.ewma / max(0.05, 1.0 - self.error_rate)
+    
+    def snapshot(self) -> dict[str, Any]:
+        def ms(value: float | None) -> float | None:
+            return round(value * 1000, 1) if value is not None else None
+        
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "latency_ms_ewma": ms(self.latency.ewma),
+            "latency_ms_p95": ms(self.latency.percentile(0.95)),
+            "ttft_ms_ewma": ms(self.ttft.ewma),
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+class RoutingProvider(LLMProvider):
+    """
+    Routes each request across several providers by observed performance.
+    
+    Backends are ranked by EWMA latency inflated by their EWMA error rate;
+    the best one gets the request and the next ones are failed over to in
+    order. With hedging on, a ``generate`` call whose primary hasn't answered
+    within that backend's p95 latency also fires a duplicate at the next
+    backend, and the first answer wins (the other call is cancelled). Streams
+    are never hedged, but fail over if a backend errors before its first delta.
+    
+    The wrapped providers are owned by the registry; ``aclose`` doesn't close them.
+    """
+    
+    def __init__(
+        self,
+        backends: dict[str, LLMProvider],
+        hedge: bool = True,
+        hedge_min_delay: float = 0.5,
+        hedge_budget: float = 0.1,
+        explore: float = 0.05,
+        alpha: float = 0.2,
+    ):
+        if not backends:
+            raise ValueError("RoutingProvider needs at least one backend")
+        
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget
+        self.explore = explore
+        self.stats = {name: BackendStats(alpha) for name in backends}
+        self.requests = 0
+        self.hedges = 0
+    
+    @classmethod
+    def from_settings(cls, backends: dict[str, LLMProvider]) -> "RoutingProvider":
+        settings = get_settings()
+        return cls(
+            backends,
+            hedge=settings.LLM_ROUTER_HEDGE,
+            hedge_min_delay=settings.LLM_ROUTER_HEDGE_MIN_DELAY,
+            hedge_budget=settings.LLM_ROUTER_HEDGE_BUDGET,
+            explore=settings.LLM_ROUTER_EXPLORE,
+        )
+    
+    def _by_score(self, streaming: bool = False) -> list[str]:
+        def score(name: str) -> float:
+            stats = self.stats[name]
+            return stats.score(stats.ttft if streaming else stats.latency)
+        
+        return sorted(self.backends, key=score)
+    
+    def ranked(self, streaming: bool = False) -> list[str]:
+        """Backend names, best first."""
+        order = self._by_score(streaming)
+        
+        # Occasionally lead with another backend so a recovered one gets noticed
+        if len(order) > 1 and random.random() < self.explore:
+            order.insert(0, order.pop(random.randrange(1, len(order))))
+        
+        return order
+    
+    def _hedge_delay(self, name: str) -> float | None:
+        """Seconds to wait on `name` before hedging, None if hedging doesn't apply."""
+        if not self.hedge or self.hedges >= self.hedge_budget * self.requests:
+            return None
+        
+        tracker = self.stats[name].latency
+        if len(tracker.samples) < MIN_HEDGE_SAMPLES:
+            return None
+        
+        return max(self.hedge_min_delay, tracker.percentile(0.95))
+    
+    async def _call(self, name: str, messages: list[dict[str, str]], kwargs: dict[str, Any]) -> str:
+        stats = self.stats[name]
+        started = time.perf_counter()
+        
+        try:
+            result = await self.backends[name].generate(messages, **kwargs)
+        except asyncio.CancelledError:
+            # Lost a hedge race: it took at least this long, which is still a useful sample
+            stats.latency.record(time.perf_counter() - started)
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        
+        stats.record_success(stats.latency, time.perf_counter() - started)
+        return result
+    
+    @staticmethod
+    def _raise_all_failed(errors: list[tuple[str, Exception]]) -> None:
+        # Keep 429 semantics when every backend was rate limited
+        if errors and all(isinstance(e, RateLimitError) for _, e in errors):
+            retry_after = min((e.retry_after or 1.0) for _, e in errors)
+            raise RateLimitError("All LLM backends are rate limited", retry_after=retry_after)
+        
+        detail = "; ".join(f"{name}: {e}" for name, e in errors)
+        raise Exception(f"All LLM backends failed: {detail}")
+    
+    async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
+        """
+        Generate a response on the best backend, hedging and failing over as needed.
+        
+        Raises:
+            RateLimitError: If every backend was rate limited
+            Exception: If every backend failed
+        """
+        self.requests += 1
+        order = self.ranked()
+        errors: list[tuple[str, Exception]] = []
+        pending: dict[asyncio.Task, str] = {}
+        
+        def launch(name: str) -> None:
+            pending[asyncio.create_task(self._call(name, messages, kwargs))] = name
+        
+        hedged: str | None = None
+        primary = order.pop(0)
+        launch(primary)
+        hedge_delay = self._hedge_delay(primary) if order else None
+        
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                
+                if not done:
+                    # Primary is slower than its p95: race a duplicate on the next backend
+                    hedge_delay = None
+                    self.hedges += 1
+                    hedged = order.pop(0)
+                    launch(hedged)
+                    continue
+                
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning("LLM backend %r failed: %s", name, e)
+                        errors.append((name, e))
+                        continue
+                    
+                    if name == hedged:
+                        self.stats[name].hedge_wins += 1
+                    return result
+                
+                # Everything in flight failed: fail over to the next backend
+                if not pending and order:
+                    hedge_delay = None
+                    launch(order.pop(0))
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        self._raise_all_failed(errors)
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream from the best backend, failing over if it errors before its first delta.
+        
+        Raises:
+            RateLimitError: If every backend was rate limited
+            Exception: If every backend failed, or the chosen one failed mid-stream
+        """
+        self.requests += 1
+        errors: list[tuple[str, Exception]] = []
+        
+        for name in self.ranked(streaming=True):
+            stats = self.stats[name]
+            started = time.perf_counter()
+            emitted = False
+            
+            try:
+                async for delta in self.backends[name].generate_stream(messages, **kwargs):
+                    if not emitted:
+                        stats.record_success(stats.ttft, time.perf_counter() - started)
+                        emitted = True
+                    yield delta
+            except Exception as e:
+                stats.record_failure()
+                if emitted:
+                    raise
+                logger.warning("LLM backend %r failed before streaming: %s", name, e)
+                errors.append((name, e))
+                continue
+            
+            if not emitted:
+                stats.record_success(stats.ttft, time.perf_counter() - started)
+            return
+        
+        self._raise_all_failed(errors)
+    
+    async def validate_connection(self) -> bool:
+        """True if any backend is reachable."""
+        results = await asyncio.gather(
+            *(backend.validate_connection() for backend in self.backends.values()),
+            return_exceptions=True,
+        )
+        return any(result is True for result in results)
+    
+    def describe(self) -> dict[str, Any]:
+        """Any backend may answer, so the description covers all of them."""
+        backends = [backend.describe() for backend in self.backends.values()]
+        temperatures = [b.get("temperature") for b in backends]
+        return {
+            "provider": "router",
+            "backends": backends,
+            # Deterministic only if every backend is
+            "temperature": 0 if all(t == 0 for t in temperatures) else max(
+                (t for t in temperatures if t is not None), default=None
+            ),
+        }
+    
+    def pool_stats(self) -> dict[str, Any]:
+        """Routing statistics per backend."""
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "ranking": self._by_score(),
+            "backends": {name: stats.snapshot() for name, stats in self.stats.items()},
+        }
@@ -0,0 +1,343 @@
+import asyncio
+import difflib
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import numpy as np
+
+from app.services.llm.cache import canonical_key
+from app.services.prompt_cache import SystemPrefix
+from app.core.config import get_settings
+
+_WORD = re.compile(r"\w+")
+
+# Indexes at least this large are searched off the event loop
+OFFLOAD_ENTRIES = 4096
+
+# Best matches above the threshold checked for the same content words
+MAX_CANDIDATES = 8
+
+# Words that can differ between two phrasings of the same question. Negations
+# ("not", "no", the "t" of "can't") and prepositions are left out on purpose.
+FUNCTION_WORDS = frozenset(
+    "a an the this that these those i me my mine we us our you your it its they them their "
+    "is am are was were be been being do does did doing have has had can could will would "
+    "shall should may might must s d ll m re ve what whats which who whom whose where when "
+    "why how please tell know there here just".split()
+)
+
+# Differing content words this similar (difflib ratio) count as the same word
+SAME_WORD_RATIO = 0.8
+
+
+def content_words(text: str) -> frozenset[str]:
+    """The words of `text` that carry its meaning (lowercased, function words dropped)."""
+    return frozenset(w for w in _WORD.findall(text.lower()) if w not in FUNCTION_WORDS)
+
+
+def same_content(a: frozenset[str], b: frozenset[str]) -> bool:
+    """
+    Whether two questions' content words match.
+    
+    Every word only one side has must be a typo or inflection of a word only
+    the other side has ("password"/"passwords"), so "pro plan" vs "basic
+    plan" - near-identical vectors - don't match.
+    """
+    only_a, only_b = a - b, b - a
+    
+    def covered(words: frozenset[str], others: frozenset[str]) -> bool:
+        return all(
+            any(difflib.SequenceMatcher(None, word, other).ratio() >= SAME_WORD_RATIO for other in others)
+            for word in words
+        )
+    
+    return covered(only_a, only_b) and covered(only_b, only_a)
+
+
+class HashingVectorizer:
+    """
+    Dependency-light text embedding for near-duplicate detection.
+    
+    Word unigrams, word bigrams and character trigrams are hashed (crc32,
+    stable across processes) into a fixed number of signed buckets, then
+    L2-normalized, so a dot product is the cosine similarity. Char trigrams
+    make it tolerant of typos and inflections; bigrams keep some word order.
+    """
+    
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+    
+    def features(self, text: str) -> list[str]:
+        words = _WORD.findall(text.lower())
+        features = [f"w:{w}" for w in words]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+    
+    def transform(self, text: str) -> np.ndarray:
+        """Embed one text as a unit-length float32 vector (all zeros for empty text)."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        
+        for feature in self.features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class VectorIndex:
+    """
+    Brute-force cosine index over a preallocated float32 matrix.
+    
+    The matrix starts small and grows by doubling up to ``max_entries`` rows;
+    when full, the oldest entry is overwritten. ``search`` may run in a worker thread while
+    the event loop keeps adding: every row carries a write stamp, and
+    ``response`` only returns a match whose row wasn't rewritten meanwhile.
+    """
+    
+    def __init__(self, dim: int, max_entries: int, initial_capacity: int = 64):
+        self.dim = dim
+        self.max_entries = max_entries
+        capacity = min(initial_capacity, max_entries)
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires = np.zeros(capacity, dtype=np.float64)
+        self.stamps = np.zeros(capacity, dtype=np.int64)
+        self.responses: list[str | None] = [None] * capacity
+        self.words: list[frozenset[str]] = [frozenset()] * capacity
+        self.writes = 0
+        self.size = 0
+        self.expires_at = 0.0  # Of the newest entry; every entry is expired after it
+        self._response_bytes = 0
+        self._next = 0  # Write position once the index is full
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: the matrices plus the cached response text."""
+        return self.vectors.nbytes + self.expires.nbytes + self.stamps.nbytes + self._response_bytes
+    
+    def _grow(self) -> None:
+        capacity = min(len(self.vectors) * 2, self.max_entries)
+        extra = capacity - len(self.vectors)
+        self.vectors = np.vstack([self.vectors, np.zeros((extra, self.dim), dtype=np.float32)])
+        self.expires = np.concatenate([self.expires, np.zeros(extra, dtype=np.float64)])
+        self.stamps = np.concatenate([self.stamps, np.zeros(extra, dtype=np.int64)])
+        self.responses.extend([None] * extra)
+        self.words.extend([frozenset()] * extra)
+    
+    def add(self, vector: np.ndarray, words: frozenset[str], response: str, expires_at: float) -> None:
+        if self.size < self.max_entries:
+            if self.size == len(self.vectors):
+                self._grow()
+            position = self.size
+            self.size += 1
+        else:
+            position = self._next
+            self._next = (self._next + 1) % self.max_entries
+        
+        replaced = self.responses[position]
+        if replaced is not None:
+            self._response_bytes -= len(replaced)
+        self._response_bytes += len(response)
+        
+        self.vectors[position] = vector
+        self.expires[position] = expires_at
+        self.responses[position] = response
+        self.words[position] = words
+        self.expires_at = max(self.expires_at, expires_at)
+        self.writes += 1
+        self.stamps[position] = self.writes
+    
+    def search(
+        self,
+        vector: np.ndarray,
+        now: float,
+        min_score: float,
+        limit: int = MAX_CANDIDATES,
+    ) -> list[tuple[float, int, int]]:
+        """Up to `limit` live matches scoring at least `min_score`, best first, as (similarity, row, stamp)."""
+        size = self.size
+        if size == 0:
+            return []
+        
+        stamps = self.stamps[:size].copy()
+        scores = self.vectors[:size] @ vector
+        scores[self.expires[:size] <= now] = -1.0
+        
+        rows = np.flatnonzero(scores >= min_score)
+        if len(rows) > limit:
+            rows = rows[np.argpartition(scores[rows], -limit)[-limit:]]
+        rows = rows[np.argsort(-scores[rows])]
+        return [(float(scores[row]), int(row), int(stamps[row])) for row in rows]
+    
+    def entry(self, row: int, stamp: int) -> tuple[frozenset[str], str] | None:
+        """The content words and response a ``search`` matched, None if the row was rewritten since."""
+        if stamp == 0 or self.stamps[row] != stamp:
+            return None
+        return self.words[row], self.responses[row]
+
+
+class SemanticCache:
+    """
+    Per-project cache of answers to first questions, matched by similarity.
+    
+    Only first turns are cached (system messages plus one user message), so
+    the question is the only variable part; the system messages and provider
+    description form the scope, and each (project, scope) pair gets its own
+    index. An answer is reused when the new question's cosine similarity to
+    a cached one is at least ``threshold`` and both have the same content
+    words (up to typos and inflections): hashed vectors alone score "price
+    of the pro plan" and "price of the basic plan" around 0.85.
+    
+    Indexes are kept in LRU order: past ``max_indexes`` indexes or
+    ``max_bytes`` in total, the least recently used are dropped, as is any
+    index whose entries have all expired.
+    """
+    
+    def __init__(
+        self,
+        threshold: float,
+        dim: int,
+        max_entries: int,
+        ttl: float,
+        max_indexes: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_indexes = max_indexes
+        self.max_bytes = max_bytes
+        self.vectorizer = HashingVectorizer(dim)
+        self._indexes: OrderedDict[tuple[Hashable, str], VectorIndex] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _get(self, key: tuple[Hashable, str], now: float) -> VectorIndex | None:
+        """The index for `key`, marked as recently used; None if absent or fully expired."""
+        index = self._indexes.get(key)
+        if index is None:
+            return None
+        
+        if index.expires_at <= now:
+            self._drop(key)
+            return None
+        
+        self._indexes.move_to_end(key)
+        return index
+    
+    def _drop(self, key: tuple[Hashable, str]) -> None:
+        self._bytes -= self._indexes.pop(key).nbytes
+    
+    def _evict(self, now: float) -> None:
+        """Drop expired indexes from the cold end, then LRU indexes until within the limits."""
+        while self._indexes:
+            key, index = next(iter(self._indexes.items()))
+            if index.expires_at > now:
+                if len(self._indexes) <= self.max_indexes and self._bytes <= self.max_bytes:
+                    break
+                self.evictions += 1
+            self._drop(key)
+    
+    @staticmethod
+    def applies(messages: list[dict[str, str]]) -> bool:
+        """Whether a request is a first turn: system messages then a single user message."""
+        return (
+            len(messages) > 0
+            and messages[-1]["role"] == "user"
+            and all(m["role"] == "system" for m in messages[:-1])
+        )
+    
+    @staticmethod
+    def scope(
+        description: dict[str, Any],
+        messages: list[dict[str, str]],
+        prefix: SystemPrefix | None = None,
+    ) -> str:
+        """
+        Key of everything but the question: provider description and system messages.
+        
+        The system messages are keyed by `prefix`'s hash when they are that
+        compiled prefix.
+        """
+        return canonical_key(description, messages[:-1], prefix)
+    
+    async def lookup(self, project_id: Hashable, scope: str, question: str) -> str | None:
+        """
+        The cached answer to the most similar question, if similar enough.
+        
+        Large indexes are searched in a worker thread (NumPy releases the GIL)
+        so a scan doesn't stall the event loop.
+        """
+        now = time.monotonic()
+        index = self._get((project_id, scope), now)
+        if index is None:
+            self.misses += 1
+            return None
+        
+        vector = self.vectorizer.transform(question)
+        if index.size >= OFFLOAD_ENTRIES:
+            candidates = await asyncio.to_thread(index.search, vector, now, self.threshold)
+        else:
+            candidates = index.search(vector, now, self.threshold)
+        
+        words = content_words(question)
+        for _, row, stamp in candidates:
+            entry = index.entry(row, stamp)
+            if entry is not None and same_content(words, entry[0]):
+                self.hits += 1
+                return entry[1]
+        
+        self.misses += 1
+        return None
+    
+    def store(self, project_id: Hashable, scope: str, question: str, response: str) -> None:
+        now = time.monotonic()
+        key = (project_id, scope)
+        index = self._get(key, now)
+        if index is None:
+            index = self._indexes[key] = VectorIndex(self.vectorizer.dim, self.max_entries)
+            self._bytes += index.nbytes
+        
+        nbytes = index.nbytes
+        index.add(self.vectorizer.transform(question), content_words(question), response, now + self.ttl)
+        self._bytes += index.nbytes - nbytes
+        self._evict(now)
+    
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "indexes": len(self._indexes),
+            "entries": sum(index.size for index in self._indexes.values()),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "threshold": self.threshold,
+        }
+
+
+def create_semantic_cache() -> SemanticCache | None:
+    """Build the semantic cache from settings, None if it's disabled."""
+    settings = get_settings()
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    
+    return SemanticCache(
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        dim=settings.SEMANTIC_CACHE_DIM,
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl=settings.SEMANTIC_CACHE_TTL,
+        max_indexes=settings.SEMANTIC_CACHE_MAX_INDEXES,
+        max_bytes=settings.SEMANTIC_CACHE_MAX_BYTES,
+    )
@@ -0,0 +1,92 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Iterable
+from uuid import UUID
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class SystemPrefix:
+    """
+    A project's compiled system messages: its prompts in creation order, or
+    the default instruction when it has none.
+    
+    The message dicts are shared by every turn that uses the prefix and must
+    not be mutated. ``hash`` is a stable digest of their exact content, so
+    equal prefixes are byte-identical across turns, workers and restarts
+    (which is what providers' prompt caching keys on); response and semantic
+    cache keys use it in place of the messages themselves.
+    """
+    
+    __slots__ = ("version", "name", "messages", "hash")
+    
+    def __init__(self, version: int, name: str, messages: list[dict[str, str]]):
+        self.version = version
+        self.name = name
+        self.messages = messages
+        self.hash = hashlib.sha256(
+            json.dumps(messages, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+    
+    @classmethod
+    def compile(cls, version: int, name: str, prompt_contents: Iterable[str]) -> "SystemPrefix":
+        messages = [{"role": "system", "content": content} for content in prompt_contents]
+        if not messages:
+            messages = [{"role": "system", "content": f"You are a helpful assistant for {name}."}]
+        return cls(version, name, messages)
+
+
+class SystemPrefixCache:
+    """
+    In-process LRU of compiled system prefixes by project.
+    
+    An entry is only used while the project row's ``prompts_version`` (and
+    name, which the default prefix includes) match it, so prompt writes on
+    other workers are picked up on the next turn. Any endpoint that creates,
+    changes or deletes prompts must bump ``Project.prompts_version`` in its
+    transaction and call ``invalidate`` after committing.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[UUID, SystemPrefix] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def peek(self, project_id: UUID) -> SystemPrefix | None:
+        """The project's entry whatever its version, without counting a lookup."""
+        return self._entries.get(project_id)
+    
+    def get(self, project_id: UUID, version: int, name: str) -> SystemPrefix | None:
+        prefix = self._entries.get(project_id)
+        if prefix is None or prefix.version != version or prefix.name != name:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(project_id)
+        self.hits += 1
+        return prefix
+    
+    def set(self, project_id: UUID, prefix: SystemPrefix) -> None:
+        self._entries[project_id] = prefix
+        self._entries.move_to_end(project_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, project_id: UUID) -> None:
+        self._entries.pop(project_id, None)
+    
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "projects": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+prompt_cache = SystemPrefixCache(max_entries=settings.PROMPT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,165 @@
+import sys
+from collections import OrderedDict, deque
+from typing import Any, Iterable, Iterator
+from uuid import UUID
+
+from app.models.chat import Message, MessageRole
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Non-system roles by their one-byte code
+ROLES = (MessageRole.USER.value, MessageRole.ASSISTANT.value)
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+# Rough per-entry bookkeeping cost (deque, dict slot) and per-message tuple + UUID cost
+ENTRY_OVERHEAD_BYTES = 700
+MESSAGE_OVERHEAD_BYTES = 160
+
+
+class SessionContext:
+    """
+    History tail of one session as of a given ``ChatSession.version``.
+    
+    Holds (message id, role code, content) tuples - the content strings are
+    shared with whatever loaded them, not copied - and no ORM objects.
+    """
+    
+    __slots__ = ("version", "messages", "bytes")
+    
+    def __init__(self, version: int, max_messages: int):
+        self.version = version
+        self.messages: deque[tuple[UUID, int, str]] = deque(maxlen=max_messages)
+        self.bytes = ENTRY_OVERHEAD_BYTES
+    
+    def append(self, message_id: UUID, role: str, content: str) -> None:
+        if role not in ROLE_CODES:
+            return
+        
+        if len(self.messages) == self.messages.maxlen:
+            self.bytes -= MESSAGE_OVERHEAD_BYTES + sys.getsizeof(self.messages[0][2])
+        self.messages.append((message_id, ROLE_CODES[role], content))
+        self.bytes += MESSAGE_OVERHEAD_BYTES + sys.getsizeof(content)
+    
+    def history(self) -> Iterator[tuple[UUID, str, str]]:
+        """(message_id, role, content) tuples, oldest first, as ContextWindow.build takes them."""
+        for message_id, code, content in self.messages:
+            yield message_id, ROLES[code], content
+
+
+class SessionContextCache:
+    """
+    In-process LRU of recent sessions' history, bounded by total bytes.
+    
+    Saves the history query on follow-up turns. Every write to a session's
+    messages or summary bumps ``ChatSession.version`` in the same
+    transaction, so an entry is only used while its version matches the row
+    just loaded - other workers' writes make it a miss instead of a stale
+    hit. This worker's own writes are appended to the entry (write-through)
+    when they advance the version by exactly one.
+    """
+    
+    def __init__(self, max_bytes: int, max_messages: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.enabled = enabled
+        self.bytes = 0
+        self._entries: OrderedDict[UUID, SessionContext] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+    
+    def get(self, session_id: UUID, version: int) -> SessionContext | None:
+        """The cached context if it is at `version`, else None (and a stale entry is dropped)."""
+        if not self.enabled:
+            return None
+        
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        if entry.version != version:
+            self._remove(session_id)
+            self.stale += 1
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return entry
+    
+    def put(self, session_id: UUID, version: int, messages: Iterable[Message]) -> None:
+        """Cache a session's history tail (oldest first) as loaded at `version`."""
+        if not self.enabled:
+            return
+        
+        entry = SessionContext(version, self.max_messages)
+        for message in messages:
+            entry.append(message.id, message.role.value, message.content)
+        
+        self._remove(session_id)
+        self._entries[session_id] = entry
+        self.bytes += entry.bytes
+        self._evict()
+    
+    def append(self, session_id: UUID, version: int, message: Message) -> None:
+        """
+        Write a new message through to the cached context.
+        
+        `version` is the session version after the write; unless the entry
+        was at exactly the version before it, someone else wrote in between
+        and the entry is dropped.
+        """
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        
+        if entry.version != version - 1:
+            self._remove(session_id)
+            return
+        
+        self.bytes -= entry.bytes
+        entry.append(message.id, message.role.value, message.content)
+        entry.version = version
+        self.bytes += entry.bytes
+        self._evict()
+    
+    def invalidate(self, session_id: UUID) -> None:
+        self._remove(session_id)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+    
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "sessions": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+    
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def _remove(self, session_id: UUID) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self.bytes -= entry.bytes
+
+
+session_cache = SessionContextCache(
+    max_bytes=settings.SESSION_CACHE_MAX_BYTES,
+    max_messages=settings.LLM_CONTEXT_MAX_MESSAGES,
+    enabled=settings.SESSION_CACHE_ENABLED,
+)
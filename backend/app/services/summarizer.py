@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.chat import ChatSession, Message, MessageRole
+from app.services.context import count_tokens, message_tokens
+from app.services.llm.base import LLMProvider
+from app.services.llm.registry import LLMProviderRegistry, ProviderUnavailableError
+from app.db.session import AsyncSessionLocal
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the summary with the new messages. Keep names, facts, decisions, open "
+    "questions and user preferences; drop small talk. Reply with the summary only."
+)
+
+
+class Summarizer(ABC):
+    """Abstract base class for conversation summarizers."""
+    
+    @abstractmethod
+    async def summarize(self, previous_summary: str | None, messages: list[dict[str, str]]) -> str:
+        """
+        Fold messages into a conversation summary.
+        
+        Args:
+            previous_summary: Summary so far, None for the first compaction
+            messages: Message dictionaries with 'role' and 'content', oldest first
+            
+        Returns:
+            The updated summary text
+        """
+        pass
+
+
+class LLMSummarizer(Summarizer):
+    """Summarizer backed by an LLM provider."""
+    
+    def __init__(self, llm_provider: LLMProvider):
+        self.llm_provider = llm_provider
+    
+    async def summarize(self, previous_summary: str | None, messages: list[dict[str, str]]) -> str:
+        """Ask the provider to fold the messages into the previous summary."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        
+        return await self.llm_provider.generate([
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+            {
+                "role": "user",
+                "content": f"Summary so far:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}",
+            },
+        ])
+
+
+class SessionCompactor:
+    """
+    Compacts long chat sessions into rolling summaries in the background.
+    
+    Once a session has more than `threshold` messages past its summary's
+    high-water mark, all but the `keep_recent` newest of them are folded into
+    ``ChatSession.summary`` and the high-water mark is advanced.
+    
+    Messages are folded in chunks of at most `chunk_messages` messages and
+    `chunk_tokens` tokens (previous summary included), each committed before
+    the next, so a long backlog makes steady progress instead of one call
+    that overflows the model's context. A session whose compaction failed is
+    not retried until its backoff (doubling per consecutive failure) passes.
+    """
+    
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        threshold: int,
+        keep_recent: int,
+        chunk_tokens: int = 4000,
+        chunk_messages: int = 200,
+        retry_backoff: float = 60.0,
+        max_retry_backoff: float = 3600.0,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ):
+        self.summarizer = summarizer
+        self.threshold = threshold
+        self.keep_recent = keep_recent
+        self.chunk_tokens = chunk_tokens
+        self.chunk_messages = chunk_messages
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.session_factory = session_factory
+        self._tasks: dict[UUID, asyncio.Task] = {}
+        # Session id -> (consecutive failures, monotonic time before which it isn't retried)
+        self._failures: dict[UUID, tuple[int, float]] = {}
+    
+    def maybe_schedule(self, chat_session_id: UUID, unsummarized: int) -> bool:
+        """
+        Start a background compaction if the session is over the threshold.
+        
+        Returns:
+            True if a compaction was started
+        """
+        if unsummarized <= self.threshold or chat_session_id in self._tasks:
+            return False
+        
+        failure = self._failures.get(chat_session_id)
+        if failure is not None and time.monotonic() < failure[1]:
+            return False
+        
+        task = asyncio.create_task(self._run(chat_session_id))
+        self._tasks[chat_session_id] = task
+        return True
+    
+    async def _run(self, chat_session_id: UUID) -> None:
+        try:
+            await self.compact(chat_session_id)
+        except Exception:
+            now = time.monotonic()
+            failures = self._failures.get(chat_session_id, (0, 0.0))[0] + 1
+            backoff = min(self.retry_backoff * 2 ** (failures - 1), self.max_retry_backoff)
+            # Forget sessions that haven't come back long after their retry was due
+            self._failures = {
+                session_id: failure
+                for session_id, failure in self._failures.items()
+                if failure[1] + self.max_retry_backoff > now
+            }
+            self._failures[chat_session_id] = (failures, now + backoff)
+            logger.exception(
+                "Compaction failed for session %s (%d in a row), retrying in %.0fs",
+                chat_session_id,
+                failures,
+                backoff,
+            )
+        else:
+            self._failures.pop(chat_session_id, None)
+        finally:
+            self._tasks.pop(chat_session_id, None)
+    
+    async def compact(self, chat_session_id: UUID) -> bool:
+        """
+        Fold older messages of a session into its summary, one chunk at a time.
+        
+        Returns:
+            True if the summary was updated
+        """
+        updated = False
+        while await self._compact_chunk(chat_session_id):
+            updated = True
+        return updated
+    
+    async def _compact_chunk(self, chat_session_id: UUID) -> bool:
+        """
+        Fold the oldest chunk of foldable messages and commit it.
+        
+        Returns:
+            True if a chunk was folded (there may be more)
+        """
+        async with self.session_factory() as db, db.begin():
+            chat_session = await db.get(ChatSession, chat_session_id)
+            if chat_session is None:
+                return False
+            
+            # A full page is followed by at least keep_recent newer messages
+            query = (
+                select(Message)
+                .where(Message.chat_session_id == chat_session_id)
+                .where(Message.role != MessageRole.SYSTEM)
+                .order_by(Message.timestamp)
+                .limit(self.chunk_messages + self.keep_recent)
+            )
+            if chat_session.summary_until is not None:
+                query = query.where(Message.timestamp > chat_session.summary_until)
+            
+            pending = (await db.execute(query)).scalars().all()
+        
+        foldable = pending[:max(len(pending) - self.keep_recent, 0)]
+        chunk = self._take_chunk(chat_session.summary, foldable)
+        if not chunk:
+            return False
+        
+        # The summarizer call runs without a database connection checked out
+        summary = await self.summarizer.summarize(chat_session.summary, chunk)
+        last = foldable[len(chunk) - 1]
+        
+        async with self.session_factory() as db, db.begin():
+            # Only advance if nobody else moved the high-water mark meanwhile
+            result = await db.execute(
+                update(ChatSession)
+                .where(ChatSession.id == chat_session_id)
+                .where(
+                    ChatSession.summary_message_id.is_(None)
+                    if chat_session.summary_message_id is None
+                    else ChatSession.summary_message_id == chat_session.summary_message_id
+                )
+                .values(
+                    summary=summary,
+                    summary_message_id=last.id,
+                    summary_until=last.timestamp,
+                    version=ChatSession.version + 1,
+                )
+            )
+        
+        return result.rowcount == 1
+    
+    def _take_chunk(self, summary: str | None, messages: list[Message]) -> list[dict[str, str]]:
+        """
+        The oldest messages that fit in chunk_tokens alongside the summary.
+        
+        Always takes at least one message, cutting its content to the budget
+        if it is too long on its own, so the high-water mark keeps moving.
+        """
+        budget = self.chunk_tokens - (count_tokens(summary) if summary else 0)
+        chunk: list[dict[str, str]] = []
+        used = 0
+        
+        for message in messages:
+            tokens = message_tokens(message.content)
+            if chunk and used + tokens > budget:
+                break
+            
+            content = message.content
+            if tokens > budget:
+                # ~4 characters per token, as in count_tokens' fallback estimate
+                content = content[:max(budget, 1) * 4]
+            chunk.append({"role": message.role.value, "content": content})
+            used += tokens
+        
+        return chunk
+    
+    async def aclose(self) -> None:
+        """Cancel compactions still in flight (on shutdown)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def create_session_compactor(registry: LLMProviderRegistry) -> SessionCompactor | None:
+    """Build the compactor from settings, None if disabled or no provider is available."""
+    settings = get_settings()
+    
+    if not settings.SUMMARY_ENABLED:
+        return None
+    
+    try:
+        llm_provider = registry.get(settings.SUMMARY_PROVIDER)
+    except (ValueError, ProviderUnavailableError) as e:
+        logger.warning("Conversation summaries disabled: %s", e)
+        return None
+    
+    return SessionCompactor(
+        LLMSummarizer(llm_provider),
+        threshold=settings.SUMMARY_THRESHOLD,
+        keep_recent=settings.SUMMARY_KEEP_RECENT,
+        chunk_tokens=settings.SUMMARY_CHUNK_TOKENS,
+        chunk_messages=settings.SUMMARY_CHUNK_MESSAGES,
+        retry_backoff=settings.SUMMARY_RETRY_BACKOFF,
+        max_retry_backoff=settings.SUMMARY_RETRY_MAX_BACKOFF,
+    )
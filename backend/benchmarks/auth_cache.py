@@ -0,0 +1,92 @@
+"""
+Cost of authenticating a request, with and without the user cache.
+
+Calls ``get_current_user`` directly (the same dependency every protected
+endpoint uses) ``--requests`` times with one valid token, from
+``--concurrency`` concurrent tasks, once with the cache disabled and once
+enabled. Reports per-auth latency and how many pool checkouts it took.
+
+Usage (from backend/, with DATABASE_URL / SECRET_KEY set as for the app):
+
+    python -m benchmarks.auth_cache --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+from typing import Any
+from uuid import uuid4
+
+from app.core.auth_cache import auth_cache
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token
+from app.db.session import AsyncSessionLocal, engine, pool_stats
+from app.models.user import User
+from app.models import project, prompt, chat  # noqa: F401 - register the related mappers
+
+
+async def authenticate(token: str) -> float:
+    """Resolve one request's user the way FastAPI would; return seconds taken."""
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await get_current_user(token, db)
+    return time.perf_counter() - started
+
+
+async def run(token: str, requests: int, concurrency: int) -> dict[str, Any]:
+    """Authenticate `requests` times from `concurrency` workers."""
+    checkouts_before = pool_stats().get("checkouts", 0)
+    remaining = iter(range(requests))
+    latencies: list[float] = []
+    
+    async def worker() -> None:
+        for _ in remaining:
+            latencies.append(await authenticate(token))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        "auth_per_sec": requests / elapsed,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(0.99 * (len(latencies) - 1))] * 1e6,
+        "db_checkouts": pool_stats().get("checkouts", 0) - checkouts_before,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{uuid4().hex}@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+    
+    token = create_access_token({"sub": str(user.id)})
+    
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'cache':<6} {'auth/s':>9} {'p50 us':>8} {'p99 us':>8} {'db checkouts':>13}")
+    
+    for enabled in (False, True):
+        auth_cache.clear()
+        auth_cache.enabled = enabled
+        stats = await run(token, args.requests, args.concurrency)
+        print(
+            f"{'on' if enabled else 'off':<6} {stats['auth_per_sec']:>9.0f} {stats['p50_us']:>8.0f} "
+            f"{stats['p99_us']:>8.0f} {stats['db_checkouts']:>13}"
+        )
+    
+    print()
+    print(f"cache stats: {auth_cache.stats()}")
+    
+    async with AsyncSessionLocal() as db:
+        await db.delete(await db.get(User, user.id))
+        await db.commit()
+    
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
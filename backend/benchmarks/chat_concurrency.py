@@ -0,0 +1,161 @@
+"""
+Concurrent chat capacity for a fixed database connection budget.
+
+Runs bursts of concurrent chat turns through ChatService with a fake LLM that
+sleeps for ``--llm-latency`` seconds. The engine's pool is capped at
+``--pool-size`` connections with no overflow, and a turn that can't get a
+connection within ``--pool-timeout`` counts as failed.
+
+Two modes are compared:
+
+- ``held``: the old pipeline - one connection checked out for the whole turn,
+  including the LLM wait
+- ``released``: the current pipeline - a connection is only held for the short
+  read/insert and write transactions around the LLM call
+
+Usage (from backend/, with DATABASE_URL / SECRET_KEY set as for the app):
+
+    python -m benchmarks.chat_concurrency --pool-size 5 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import get_settings
+from app.db.base import Base
+from app.models.user import User
+from app.models.project import Project
+from app.models.prompt import Prompt
+from app.models.chat import ChatSession, Message
+from app.services.chat_service import ChatService
+from app.services.llm.base import LLMProvider
+
+
+class SleepProvider(LLMProvider):
+    """LLM stand-in that just waits, like a slow upstream."""
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+    
+    async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
+        await asyncio.sleep(self.latency)
+        return "ok"
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        await asyncio.sleep(self.latency)
+        yield "ok"
+    
+    async def validate_connection(self) -> bool:
+        return True
+
+
+async def run_turn(engine, mode: str, service_kwargs: dict[str, Any], project_id, user_id) -> float:
+    """Run one chat turn and return its latency in seconds."""
+    started = time.perf_counter()
+    
+    if mode == "held":
+        # Bind every session of the turn to one connection held for the whole turn
+        async with engine.connect() as conn:
+            factory = async_sessionmaker(conn, class_=AsyncSession, expire_on_commit=False)
+            await ChatService(session_factory=factory, **service_kwargs).generate_response(
+                project_id, user_id, "hello"
+            )
+    else:
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await ChatService(session_factory=factory, **service_kwargs).generate_response(
+            project_id, user_id, "hello"
+        )
+    
+    return time.perf_counter() - started
+
+
+async def run_burst(engine, mode: str, concurrency: int, service_kwargs, project_id, user_id) -> dict[str, Any]:
+    """Fire `concurrency` turns at once and summarize the outcome."""
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_turn(engine, mode, service_kwargs, project_id, user_id) for _ in range(concurrency)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    
+    latencies = sorted(r for r in results if isinstance(r, float))
+    timeouts = sum(1 for r in results if isinstance(r, PoolTimeoutError))
+    errors = sum(1 for r in results if isinstance(r, BaseException)) - timeouts
+    
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "pool_timeouts": timeouts,
+        "errors": errors,
+        "turns_per_sec": len(latencies) / elapsed,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else None,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(
+        args.database_url or get_settings().DATABASE_URL,
+        pool_size=args.pool_size,
+        max_overflow=0,
+        pool_timeout=args.pool_timeout,
+    )
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    # Throwaway tenant for the run
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        user = User(email=f"bench-{uuid4().hex}@example.com", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        project = Project(user_id=user.id, name="bench")
+        db.add(project)
+        await db.flush()
+        db.add(Prompt(project_id=project.id, content="You are a benchmark."))
+        await db.commit()
+    
+    service_kwargs = {"llm_provider": SleepProvider(args.llm_latency)}
+    
+    print(
+        f"pool_size={args.pool_size} pool_timeout={args.pool_timeout}s "
+        f"llm_latency={args.llm_latency}s"
+    )
+    print(f"{'mode':<9} {'conc':>5} {'ok':>5} {'timeouts':>9} {'errors':>7} {'turns/s':>8} {'p95 ms':>8}")
+    
+    capacity = {}
+    for mode in ("held", "released"):
+        capacity[mode] = 0
+        concurrency = args.pool_size
+        while concurrency <= args.max_concurrency:
+            stats = await run_burst(engine, mode, concurrency, service_kwargs, project.id, user.id)
+            p95 = f"{stats['p95_ms']:.0f}" if stats["p95_ms"] is not None else "-"
+            print(
+                f"{mode:<9} {concurrency:>5} {stats['ok']:>5} {stats['pool_timeouts']:>9} "
+                f"{stats['errors']:>7} {stats['turns_per_sec']:>8.1f} {p95:>8}"
+            )
+            if stats["pool_timeouts"] or stats["errors"]:
+                break
+            capacity[mode] = concurrency
+            concurrency *= 2
+    
+    print()
+    for mode, max_ok in capacity.items():
+        print(f"{mode}: {max_ok} concurrent chats served with {args.pool_size} connections")
+    
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Defaults to the DATABASE_URL setting")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--pool-timeout", type=float, default=1.0)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--max-concurrency", type=int, default=320)
+    asyncio.run(main(parser.parse_args()))
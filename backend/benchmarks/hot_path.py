@@ -0,0 +1,393 @@
+"""
+Microbenchmarks for the chat hot path.
+
+Times the CPU-bound steps of a chat turn in isolation, against a throwaway
+database seeded with one session per history size:
+
+- ``load_history`` / ``build_messages`` with 10, 1k and 10k stored messages
+  (``build_messages`` gets the whole history, so the context window
+  truncation is part of what's measured)
+- Pydantic serialization of ``ChatResponse`` and ``ProjectListResponse``
+  from ORM rows, as the routers return them
+- JWT encode / decode (``core/security.py``)
+- The OpenAI-compatible provider payload: request body encoding, response
+  parsing and streamed-chunk parsing
+
+Each benchmark is calibrated to run for about ``--min-time`` seconds per
+round; the report is the per-call median and best round in microseconds.
+Save a run as a baseline and compare later runs against it (exits 1 when a
+benchmark got slower than ``--max-regression``):
+
+    python -m benchmarks.hot_path --save baseline.json
+    python -m benchmarks.hot_path --compare baseline.json --max-regression 0.2
+
+Uses a temporary SQLite file unless ``--database-url`` points at a
+throwaway database (its tables are created if missing, and rows are added).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.security import create_access_token, decode_access_token
+from app.db.base import Base
+from app.models.user import User
+from app.models.project import Project
+from app.models.prompt import Prompt
+from app.models.chat import ChatSession, Message, MessageRole
+from app.schemas.chat import ChatResponse, MessageResponse
+from app.schemas.project import ProjectListResponse, ProjectResponse
+from app.services.chat_service import ChatService
+from app.services.context import ContextWindow
+from app.services.llm.http import iter_completion_deltas
+from app.services.llm.mock import MockProvider
+from app.services.prompt_cache import SystemPrefix
+
+HISTORY_SIZES = (10, 1_000, 10_000)
+PROJECT_PAGE = 20
+
+
+def sentence(i: int) -> str:
+    return f"Message {i}: could you check the status of order {i * 7919 % 100_000} and the next steps?"
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def calibrate(call: Callable[[int], float], min_time: float) -> int:
+    """Iterations per round so one round takes about `min_time`."""
+    iterations = 1
+    while True:
+        elapsed = call(iterations)
+        if elapsed >= min_time / 10 or iterations >= 1_000_000:
+            return max(1, int(iterations * min_time / max(elapsed, 1e-9)))
+        iterations *= 10
+
+
+def measure(fn: Callable[[], Any], rounds: int, min_time: float) -> dict[str, Any]:
+    """Time a synchronous callable."""
+    def call(iterations: int) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return time.perf_counter() - started
+    
+    iterations = calibrate(call, min_time)
+    per_call = [call(iterations) / iterations for _ in range(rounds)]
+    return summarize(per_call, iterations)
+
+
+async def measure_async(fn: Callable[[], Awaitable[Any]], rounds: int, min_time: float) -> dict[str, Any]:
+    """Time a coroutine function; calibration runs it on the event loop, one call at a time."""
+    async def call(iterations: int) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        return time.perf_counter() - started
+    
+    iterations = 1
+    while True:
+        elapsed = await call(iterations)
+        if elapsed >= min_time / 10 or iterations >= 100_000:
+            iterations = max(1, int(iterations * min_time / max(elapsed, 1e-9)))
+            break
+        iterations *= 10
+    
+    per_call = [await call(iterations) / iterations for _ in range(rounds)]
+    return summarize(per_call, iterations)
+
+
+def summarize(per_call: list[float], iterations: int) -> dict[str, Any]:
+    return {
+        "median_us": statistics.median(per_call) * 1e6,
+        "min_us": min(per_call) * 1e6,
+        "iterations": iterations,
+        "rounds": len(per_call),
+    }
+
+
+async def seed(db: AsyncSession) -> tuple[Project, dict[int, ChatSession]]:
+    """One project with prompts and a page of siblings, plus a session per history size."""
+    user = User(email=f"bench-{uuid4().hex}@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    
+    projects = [
+        Project(user_id=user.id, name=f"bench {i}", description="Hot path benchmark project")
+        for i in range(PROJECT_PAGE)
+    ]
+    db.add_all(projects)
+    await db.flush()
+    project = projects[0]
+    db.add_all([
+        Prompt(project_id=project.id, content="You are a support assistant for an online store."),
+        Prompt(project_id=project.id, content="Answer briefly and ask for the order number if it is missing."),
+    ])
+    
+    sessions: dict[int, ChatSession] = {}
+    started = datetime.now(timezone.utc) - timedelta(days=1)
+    for size in HISTORY_SIZES:
+        chat_session = ChatSession(project_id=project.id)
+        db.add(chat_session)
+        await db.flush()
+        db.add_all([
+            Message(
+                chat_session_id=chat_session.id,
+                role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+                content=sentence(i),
+                timestamp=started + timedelta(milliseconds=i),
+            )
+            for i in range(size)
+        ])
+        sessions[size] = chat_session
+    
+    await db.commit()
+    return project, sessions
+
+
+def completion_bodies(provider: MockProvider, messages: list[dict[str, str]]) -> tuple[bytes, bytes]:
+    """A chat.completion response body and the equivalent ``stream=true`` body."""
+    tokens = provider.reply_tokens(messages)
+    response = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": provider.model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "".join(tokens)},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": len(tokens)},
+    }
+    
+    chunks = []
+    for token in tokens:
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": provider.model,
+            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+        }
+        chunks.append(f"data: {json.dumps(chunk)}\n\n")
+    chunks.append("data: [DONE]\n\n")
+    
+    return json.dumps(response).encode(), "".join(chunks).encode()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    database_url = args.database_url
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="hot-path-")
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    
+    results: dict[str, dict[str, Any]] = {}
+    
+    def record(name: str, stats: dict[str, Any]) -> None:
+        results[name] = stats
+        print(f"{name:<32} {stats['median_us']:>12.1f} {stats['min_us']:>12.1f} {stats['iterations']:>10}")
+    
+    try:
+        async with factory() as db:
+            project, sessions = await seed(db)
+            prompts = (await db.execute(
+                select(Prompt.content).where(Prompt.project_id == project.id).order_by(Prompt.created_at)
+            )).scalars().all()
+            prefix = SystemPrefix.compile(project.prompts_version, project.name, prompts)
+            
+            print(f"database={engine.url.render_as_string(hide_password=True)}")
+            print(f"{'benchmark':<32} {'median us':>12} {'best us':>12} {'iters':>10}")
+            
+            # The default window, with a token cache large enough for the biggest history
+            service = ChatService(
+                llm_provider=MockProvider(),
+                session_factory=factory,
+                context_window=ContextWindow(
+                    max_tokens=args.context_tokens,
+                    reserved_tokens=1024,
+                    cache_size=2 * max(HISTORY_SIZES),
+                ),
+            )
+            
+            for size, chat_session in sessions.items():
+                record(
+                    f"load_history[{size}]",
+                    await measure_async(lambda: service.load_history(db, chat_session), args.rounds, args.min_time),
+                )
+                
+                rows = (await db.execute(
+                    select(Message.id, Message.role, Message.content)
+                    .where(Message.chat_session_id == chat_session.id)
+                    .order_by(Message.timestamp)
+                )).all()
+                history = [(message_id, role.value, content) for message_id, role, content in rows]
+                record(
+                    f"build_messages[{size}]",
+                    measure(
+                        lambda: service.build_messages(prefix, chat_session, history, "Where is my order?"),
+                        args.rounds,
+                        args.min_time,
+                    ),
+                )
+            
+            # Response models from ORM rows, as the routers build them
+            user_msg, assistant_msg = (await db.execute(
+                select(Message).where(Message.chat_session_id == sessions[10].id).order_by(Message.timestamp).limit(2)
+            )).scalars().all()
+            record(
+                "ChatResponse",
+                measure(
+                    lambda: ChatResponse(
+                        session_id=sessions[10].id,
+                        message=MessageResponse.model_validate(user_msg),
+                        assistant_message=MessageResponse.model_validate(assistant_msg),
+                    ).model_dump_json(),
+                    args.rounds,
+                    args.min_time,
+                ),
+            )
+            
+            projects = (await db.execute(
+                select(Project).where(Project.user_id == project.user_id).order_by(Project.created_at)
+            )).scalars().all()
+            record(
+                f"ProjectListResponse[{len(projects)}]",
+                measure(
+                    lambda: ProjectListResponse(
+                        projects=[ProjectResponse.model_validate(p) for p in projects],
+                        next_cursor="cursor",
+                    ).model_dump_json(),
+                    args.rounds,
+                    args.min_time,
+                ),
+            )
+        
+        # JWT
+        claims = {"sub": str(uuid4())}
+        token = create_access_token(claims)
+        record("jwt_encode", measure(lambda: create_access_token(claims), args.rounds, args.min_time))
+        record("jwt_decode", measure(lambda: decode_access_token(token), args.rounds, args.min_time))
+        
+        # Provider payload: a full context window out, a reply back
+        provider = MockProvider(model="bench", response_tokens=args.response_tokens)
+        messages = service.build_messages(prefix, sessions[10_000], history, "Where is my order?")
+        payload = {"model": provider.model, "messages": messages, "temperature": 0.7, "max_tokens": 1024}
+        record(
+            f"payload_encode[{len(messages)} msgs]",
+            measure(lambda: httpx.Request("POST", "http://llm/chat/completions", json=payload), args.rounds, args.min_time),
+        )
+        
+        body, stream_body = completion_bodies(provider, messages)
+        record(
+            "payload_parse",
+            measure(
+                lambda: httpx.Response(200, content=body).json()["choices"][0]["message"]["content"],
+                args.rounds,
+                args.min_time,
+            ),
+        )
+        
+        async def parse_stream() -> str:
+            response = httpx.Response(200, content=stream_body)
+            return "".join([delta async for delta in iter_completion_deltas(response)])
+        
+        record(
+            f"stream_parse[{args.response_tokens} chunks]",
+            await measure_async(parse_stream, args.rounds, args.min_time),
+        )
+    finally:
+        await engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "database": engine.url.get_backend_name(),
+        "benchmarks": results,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Print each benchmark's change from the baseline and return the ones over `max_regression`."""
+    print()
+    print(f"vs baseline {baseline.get('commit') or '?'} ({baseline.get('started_at', '?')})")
+    print(f"{'benchmark':<32} {'baseline us':>12} {'now us':>12} {'change':>8}")
+    
+    regressions = []
+    for name, stats in report["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if before is None:
+            print(f"{name:<32} {'-':>12} {stats['median_us']:>12.1f} {'new':>8}")
+            continue
+        
+        change = stats["median_us"] / before["median_us"] - 1
+        flag = "  REGRESSION" if change > max_regression else ""
+        print(f"{name:<32} {before['median_us']:>12.1f} {stats['median_us']:>12.1f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Throwaway database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per round")
+    parser.add_argument("--context-tokens", type=int, default=8192, help="Context window for build_messages")
+    parser.add_argument("--response-tokens", type=int, default=256, help="Reply length for the payload benchmarks")
+    parser.add_argument("--save", help="Write the results to this JSON file (a new baseline)")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    
+    report = asyncio.run(run(args))
+    
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    
+    if baseline is not None:
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.max_regression:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Chat latency during a login storm.
+
+Keeps ``--chatters`` concurrent chat loops running through ChatService (with a
+fake LLM that sleeps ``--llm-latency`` seconds) and measures their turn
+latency and the event loop's scheduling lag, first at rest and then while
+``--logins`` password checks are fired at once.
+
+Two modes are compared:
+
+- ``inline``: the old login path - bcrypt verify called directly in the handler,
+  blocking the event loop
+- ``offloaded``: the current path - verify_and_update_password on the bounded
+  hashing pool
+
+Usage (from backend/, with DATABASE_URL / SECRET_KEY set as for the app):
+
+    python -m benchmarks.login_storm --logins 50 --chatters 10
+"""
+import argparse
+import asyncio
+import time
+from typing import Any
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from app.core.security import pwd_context, verify_and_update_password, shutdown_password_hasher
+from app.db.session import AsyncSessionLocal, engine
+from app.models.user import User
+from app.models.project import Project
+from app.models.prompt import Prompt
+from app.models import chat  # noqa: F401 - register the related mappers
+from app.services.chat_service import ChatService
+from benchmarks.chat_concurrency import SleepProvider
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+async def login(mode: str, password: str, hashed: str) -> bool:
+    if mode == "inline":
+        return pwd_context.verify(password, hashed)
+    verified, _ = await verify_and_update_password(password, hashed)
+    return verified
+
+
+async def measure(
+    mode: str | None,
+    args: argparse.Namespace,
+    service: ChatService,
+    project_id,
+    user_id,
+    hashed: str,
+) -> dict[str, Any]:
+    """Run chat loops (and a login storm unless mode is None) for one window."""
+    turn_ms: list[float] = []
+    lag_ms: list[float] = []
+    stop = asyncio.Event()
+    
+    async def chatter() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await service.generate_response(project_id, user_id, "hello")
+            turn_ms.append((time.perf_counter() - started) * 1000)
+    
+    async def ticker() -> None:
+        interval = 0.01
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag_ms.append((time.perf_counter() - started - interval) * 1000)
+    
+    tasks = [asyncio.create_task(chatter()) for _ in range(args.chatters)]
+    tasks.append(asyncio.create_task(ticker()))
+    
+    rejected = 0
+    started = time.perf_counter()
+    if mode is None:
+        await asyncio.sleep(args.window)
+    else:
+        results = await asyncio.gather(
+            *(login(mode, "benchmark-password", hashed) for _ in range(args.logins)),
+            return_exceptions=True,
+        )
+        rejected = sum(1 for r in results if isinstance(r, HTTPException))
+    storm_s = time.perf_counter() - started
+    
+    stop.set()
+    await asyncio.gather(*tasks)
+    
+    return {
+        "turns": len(turn_ms),
+        "turn_p50_ms": percentile(turn_ms, 0.5),
+        "turn_p95_ms": percentile(turn_ms, 0.95),
+        "turn_max_ms": max(turn_ms, default=0.0),
+        "lag_max_ms": max(lag_ms, default=0.0),
+        "storm_s": storm_s,
+        "rejected": rejected,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{uuid4().hex}@example.com", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        project = Project(user_id=user.id, name="bench")
+        db.add(project)
+        await db.flush()
+        db.add(Prompt(project_id=project.id, content="You are a benchmark."))
+        await db.commit()
+    
+    hashed = pwd_context.hash("benchmark-password")
+    service = ChatService(llm_provider=SleepProvider(args.llm_latency))
+    
+    print(f"logins={args.logins} chatters={args.chatters} llm_latency={args.llm_latency}s")
+    print(
+        f"{'phase':<10} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+        f"{'loop lag max':>13} {'storm s':>8} {'503s':>5}"
+    )
+    
+    for mode in (None, "inline", "offloaded"):
+        stats = await measure(mode, args, service, project.id, user.id, hashed)
+        print(
+            f"{mode or 'baseline':<10} {stats['turns']:>6} {stats['turn_p50_ms']:>8.0f} "
+            f"{stats['turn_p95_ms']:>8.0f} {stats['turn_max_ms']:>8.0f} {stats['lag_max_ms']:>13.0f} "
+            f"{stats['storm_s']:>8.1f} {stats['rejected']:>5}"
+        )
+    
+    async with AsyncSessionLocal() as db:
+        await db.delete(await db.get(User, user.id))
+        await db.commit()
+    
+    shutdown_password_hasher()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--chatters", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--window", type=float, default=2.0, help="Baseline measurement seconds")
+    asyncio.run(main(parser.parse_args()))
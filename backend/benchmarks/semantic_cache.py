@@ -0,0 +1,107 @@
+"""
+Lookup latency of the semantic cache at scale.
+
+Fills one project/prompt index with ``--entries`` synthetic questions
+(random word sequences from a generated vocabulary), then times
+``--lookups`` lookups of reworded stored questions and of unseen ones.
+Reports vectorize and search time separately, since search grows linearly
+with the index and vectorizing doesn't.
+
+Usage (from backend/):
+
+    python -m benchmarks.semantic_cache --entries 100000 --lookups 2000
+"""
+import argparse
+import random
+import string
+import time
+from typing import Any
+from uuid import uuid4
+
+from app.services.llm.semantic_cache import SemanticCache
+
+SCOPE = "bench"
+
+
+def vocabulary(rng: random.Random, size: int) -> list[str]:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(size)]
+
+
+def question(rng: random.Random, words: list[str]) -> str:
+    return " ".join(rng.choice(words) for _ in range(rng.randint(5, 12))) + "?"
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(0.99 * (len(samples) - 1))] * 1e6,
+    }
+
+
+def run(cache: SemanticCache, project_id: Any, queries: list[str]) -> dict[str, Any]:
+    """Time vectorizing and searching each query; count hits."""
+    index = cache._indexes[(project_id, SCOPE)]
+    vectorize: list[float] = []
+    search: list[float] = []
+    hits = 0
+    
+    for text in queries:
+        started = time.perf_counter()
+        vector = cache.vectorizer.transform(text)
+        vectorized = time.perf_counter()
+        candidates = index.search(vector, time.monotonic(), cache.threshold)
+        search.append(time.perf_counter() - vectorized)
+        vectorize.append(vectorized - started)
+        hits += bool(candidates)
+    
+    return {
+        "vectorize": percentiles(vectorize),
+        "search": percentiles(search),
+        "hit_ratio": hits / len(queries),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    cache = SemanticCache(threshold=args.threshold, dim=args.dim, max_entries=args.entries, ttl=3600)
+    project_id = uuid4()
+    words = vocabulary(rng, args.vocabulary)
+    
+    stored: list[str] = []
+    started = time.perf_counter()
+    for _ in range(args.entries):
+        text = question(rng, words)
+        cache.store(project_id, SCOPE, text, "answer")
+        stored.append(text)
+    fill = time.perf_counter() - started
+    
+    index = cache._indexes[(project_id, SCOPE)]
+    print(
+        f"entries={index.size} dim={args.dim} vocabulary={args.vocabulary} "
+        f"matrix={index.vectors.nbytes / 2**20:.1f} MiB fill={fill:.1f}s"
+    )
+    
+    # Reworded by dropping the "?" and changing case: stored questions should still hit
+    seen = [text.rstrip("?").upper() for text in rng.sample(stored, args.lookups)]
+    unseen = [question(rng, words) for _ in range(args.lookups)]
+    
+    print(f"{'queries':<8} {'vec p50':>8} {'vec p99':>8} {'search p50':>11} {'search p99':>11} {'hits':>6}")
+    for label, queries in (("seen", seen), ("unseen", unseen)):
+        stats = run(cache, project_id, queries)
+        print(
+            f"{label:<8} {stats['vectorize']['p50_us']:>8.0f} {stats['vectorize']['p99_us']:>8.0f} "
+            f"{stats['search']['p50_us']:>11.0f} {stats['search']['p99_us']:>11.0f} {stats['hit_ratio']:>6.1%}"
+        )
+    print("(times in microseconds)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,143 @@
+"""
+OpenAI-compatible stub LLM server for offline load tests.
+
+Serves ``POST /v1/chat/completions`` (plain and ``stream: true``) and
+``GET /v1/models`` with the MockProvider's deterministic replies, latency
+distributions, token rate and injected 500 / 429 rates. Point the real
+HTTP providers at it to exercise their pooled clients, streaming parser,
+rate limiter and retries without calling a real API:
+
+    python -m benchmarks.stub_server --port 8081 --latency 0.3 --distribution longtail
+
+    GROQ_BASE_URL=http://127.0.0.1:8081/v1 GROQ_API_KEY=stub uvicorn app.main:app
+    (or OPENROUTER_BASE_URL / OPENROUTER_API_KEY with LLM_PROVIDER=openrouter)
+"""
+import argparse
+import json
+import time
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.context import message_tokens
+from app.services.llm.mock import LATENCY_DISTRIBUTIONS, MockProvider
+from app.services.llm.ratelimit import RateLimitError
+
+
+def _error(status_code: int, message: str, headers: dict[str, str] | None = None) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": "stub_error", "code": status_code}},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def create_stub_app(provider: MockProvider) -> FastAPI:
+    """Build the stub server around a MockProvider."""
+    app = FastAPI(title="Stub LLM API")
+    
+    @app.get("/v1/models")
+    async def list_models() -> dict[str, Any]:
+        return {"object": "list", "data": [{"id": provider.model, "object": "model", "owned_by": "stub"}]}
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages")
+        if not isinstance(messages, list) or not messages:
+            return _error(400, "'messages' must be a non-empty list")
+        
+        model = body.get("model") or provider.model
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        created = int(time.time())
+        kwargs = {"max_tokens": body["max_tokens"]} if body.get("max_tokens") else {}
+        
+        if not body.get("stream"):
+            try:
+                content = await provider.generate(messages, **kwargs)
+            except RateLimitError as e:
+                return _error(429, str(e), {"retry-after": f"{e.retry_after:g}"})
+            except Exception as e:
+                return _error(500, str(e))
+            
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": sum(message_tokens(m.get("content") or "") for m in messages),
+                    "completion_tokens": len(provider.reply_tokens(messages, kwargs.get("max_tokens"))),
+                },
+            }
+        
+        # Fail before the 200 is sent, like a real API, by waiting for the first token here
+        deltas = provider.generate_stream(messages, **kwargs)
+        try:
+            first = await anext(deltas, None)
+        except RateLimitError as e:
+            return _error(429, str(e), {"retry-after": f"{e.retry_after:g}"})
+        except Exception as e:
+            return _error(500, str(e))
+        
+        def chunk(delta: dict[str, str], finish_reason: str | None = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+        
+        async def events() -> AsyncIterator[str]:
+            if first is not None:
+                yield chunk({"role": "assistant", "content": first})
+            async for delta in deltas:
+                yield chunk({"content": delta})
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+        
+        return StreamingResponse(events(), media_type="text/event-stream")
+    
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--model", default="stub")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds to first token")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=64)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    stub = MockProvider(
+        model=args.model,
+        latency=args.latency,
+        latency_distribution=args.distribution,
+        latency_spread=args.spread,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(create_stub_app(stub), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,43 @@
+import os
+
+# Settings are read at import time; tests never touch these defaults' database
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+from uuid import uuid4  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.models.prompt import Prompt  # noqa: E402
+from app.models.chat import ChatSession, Message  # noqa: E402,F401 - registers the tables
+from app.models.file import File  # noqa: E402,F401 - registers the table
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    """A fresh SQLite database with the full schema."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def project(session_factory):
+    """A user's project with one prompt."""
+    async with session_factory() as db, db.begin():
+        user = User(id=uuid4(), email=f"{uuid4()}@example.com", hashed_password="x")
+        project = Project(id=uuid4(), user_id=user.id, name="Support bot")
+        db.add_all([user, project])
+        db.add(Prompt(id=uuid4(), project_id=project.id, content="Be concise."))
+    return project
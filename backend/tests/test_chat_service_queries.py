@@ -0,0 +1,114 @@
+from collections import Counter
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.project import Project
+from app.models.prompt import Prompt
+from app.services.chat_service import ChatService
+from app.services.context import ContextWindow
+from app.services.llm.base import LLMProvider
+from app.services.session_cache import SessionContextCache
+
+
+class StubProvider(LLMProvider):
+    """Never called: preparing a turn doesn't reach the provider."""
+    
+    async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
+        raise NotImplementedError
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        raise NotImplementedError
+        yield
+    
+    async def validate_connection(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed on `engine`, recorded from the moment the test asks for it."""
+    executed: list[str] = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def make_service(engine) -> ChatService:
+    return ChatService(
+        StubProvider(),
+        session_factory=async_sessionmaker(engine, expire_on_commit=False),
+        context_window=ContextWindow(max_tokens=8192, reserved_tokens=1000, cache_size=1000),
+        session_cache=SessionContextCache(max_bytes=1_000_000, max_messages=100),
+    )
+
+
+def verbs(statements: list[str]) -> Counter[str]:
+    """Statements executed, by SQL verb."""
+    return Counter(statement.split(None, 1)[0].upper() for statement in statements)
+
+
+async def test_new_session_statements(engine, project, statements):
+    service = make_service(engine)
+    
+    _, _, messages = await service.prepare_turn(project.id, project.user_id, "Hello")
+    
+    # Project, prompts and (no) session in one read; then the session and message inserts
+    assert verbs(statements) == {"SELECT": 1, "INSERT": 2}
+    assert messages[0] == {"role": "system", "content": "Be concise."}
+
+
+async def test_existing_session_statements(engine, project, statements):
+    chat_session, _, _ = await make_service(engine).prepare_turn(project.id, project.user_id, "Hello")
+    statements.clear()
+    
+    # A fresh service has a cold session cache
+    _, _, messages = await make_service(engine).prepare_turn(
+        project.id, project.user_id, "And again", chat_session.id
+    )
+    
+    # Project + prompts + session, then the history window; the insert and version bump
+    assert verbs(statements) == {"SELECT": 2, "INSERT": 1, "UPDATE": 1}
+    assert [m["content"] for m in messages] == ["Be concise.", "Hello", "And again"]
+
+
+async def test_existing_session_statements_with_cached_history(engine, project, statements):
+    service = make_service(engine)
+    chat_session, _, _ = await service.prepare_turn(project.id, project.user_id, "Hello")
+    statements.clear()
+    
+    _, _, messages = await service.prepare_turn(project.id, project.user_id, "And again", chat_session.id)
+    
+    # The history comes from the session cache
+    assert verbs(statements) == {"SELECT": 1, "INSERT": 1, "UPDATE": 1}
+    assert [m["content"] for m in messages] == ["Be concise.", "Hello", "And again"]
+
+
+async def test_new_prompt_loads_with_the_context(engine, project, statements):
+    service = make_service(engine)
+    chat_session, _, _ = await service.prepare_turn(project.id, project.user_id, "Hello")
+    
+    # A prompt written by another worker: the cached prefix is now stale
+    async with service.session_factory() as db, db.begin():
+        db.add(Prompt(id=uuid4(), project_id=project.id, content="Answer in French."))
+        await db.execute(
+            update(Project)
+            .where(Project.id == project.id)
+            .values(prompts_version=Project.prompts_version + 1)
+        )
+    statements.clear()
+    
+    _, _, messages = await service.prepare_turn(project.id, project.user_id, "And again", chat_session.id)
+    
+    assert verbs(statements) == {"SELECT": 1, "INSERT": 1, "UPDATE": 1}
+    assert messages[:2] == [
+        {"role": "system", "content": "Be concise."},
+        {"role": "system", "content": "Answer in French."},
+    ]
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, AsyncIterator
+
+from sqlalchemy import select
+
+from app.api.chat import chat_stream
+from app.models.chat import ChatSession, Message, MessageRole
+from app.schemas.chat import ChatRequest
+from app.services.chat_service import ChatService
+from app.services.context import ContextWindow
+from app.services.llm.base import LLMProvider
+from app.services.session_cache import SessionContextCache
+
+
+class SlowStreamProvider(LLMProvider):
+    """Streams "Hel", "lo", then stalls until the consumer goes away."""
+    
+    async def generate(self, messages: list[dict[str, str]], **kwargs: Any) -> str:
+        return "Hello"
+    
+    async def generate_stream(self, messages: list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        yield "Hel"
+        yield "lo"
+        await asyncio.sleep(3600)
+        yield "!"
+    
+    async def validate_connection(self) -> bool:
+        return True
+
+
+async def start_stream(session_factory, project) -> tuple[AsyncIterator[str], ChatService]:
+    service = ChatService(
+        SlowStreamProvider(),
+        session_factory=session_factory,
+        context_window=ContextWindow(max_tokens=8192, reserved_tokens=1000, cache_size=1000),
+        session_cache=SessionContextCache(max_bytes=1_000_000, max_messages=100),
+    )
+    response = await chat_stream(
+        ChatRequest(project_id=project.id, message="Hi"),
+        SimpleNamespace(id=project.user_id),
+        service,
+    )
+    return response.body_iterator, service
+
+
+async def stored_messages(session_factory) -> list[tuple[MessageRole, str]]:
+    async with session_factory() as db:
+        result = await db.execute(select(Message.role, Message.content).order_by(Message.timestamp))
+        return [tuple(row) for row in result.all()]
+
+
+async def test_disconnect_mid_stream_keeps_partial_reply(session_factory, project):
+    events, _ = await start_stream(session_factory, project)
+    assert (await anext(events)).startswith("event: session")
+    assert (await anext(events)).startswith("event: delta")
+    
+    await events.aclose()
+    
+    assert await stored_messages(session_factory) == [
+        (MessageRole.USER, "Hi"),
+        (MessageRole.ASSISTANT, "Hel"),
+    ]
+
+
+async def test_cancelled_while_waiting_on_provider_keeps_partial_reply(session_factory, project):
+    events, _ = await start_stream(session_factory, project)
+    
+    async def consume() -> None:
+        async for _ in events:
+            pass
+    
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    
+    assert await stored_messages(session_factory) == [
+        (MessageRole.USER, "Hi"),
+        (MessageRole.ASSISTANT, "Hello"),
+    ]
+
+
+async def test_disconnect_before_any_delta_discards_turn(session_factory, project):
+    events, _ = await start_stream(session_factory, project)
+    assert (await anext(events)).startswith("event: session")
+    
+    await events.aclose()
+    
+    assert await stored_messages(session_factory) == []
+    async with session_factory() as db:
+        assert (await db.execute(select(ChatSession))).first() is None
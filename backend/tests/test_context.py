@@ -0,0 +1,104 @@
+from app.services import context
+from app.services.context import ContextWindow, message_tokens
+
+
+def make_history(count: int) -> list[tuple[int, str, str]]:
+    """(id, role, content) tuples alternating user/assistant, oldest first."""
+    return [
+        (i, "user" if i % 2 == 0 else "assistant", f"message number {i} " + "lorem ipsum " * (i % 7))
+        for i in range(count)
+    ]
+
+
+def payload_tokens(messages: list[dict[str, str]]) -> int:
+    return sum(message_tokens(m["content"]) for m in messages)
+
+
+SYSTEM = [{"role": "system", "content": "You are a helpful assistant."}]
+
+
+def test_budget_respected_on_long_history():
+    window = ContextWindow(max_tokens=2000, reserved_tokens=500, cache_size=20_000)
+    
+    messages = window.build(SYSTEM, make_history(10_000), "What did we talk about?")
+    
+    assert payload_tokens(messages) <= window.budget
+    assert messages.tokens == payload_tokens(messages)
+    assert 2 < len(messages) < 10_000
+
+
+def test_system_and_user_message_always_kept():
+    window = ContextWindow(max_tokens=10, reserved_tokens=5, cache_size=100)
+    
+    messages = window.build(SYSTEM, make_history(50), "A question well over the tiny budget")
+    
+    assert messages == [*SYSTEM, {"role": "user", "content": "A question well over the tiny budget"}]
+
+
+def test_kept_history_is_most_recent_in_order():
+    history = make_history(1000)
+    window = ContextWindow(max_tokens=1500, reserved_tokens=500, cache_size=2000)
+    
+    messages = window.build(SYSTEM, history, "Next question")
+    kept = messages[1:-1]
+    
+    expected = [{"role": role, "content": content} for _, role, content in history[-len(kept):]]
+    assert kept == expected
+
+
+def test_whole_history_kept_when_it_fits():
+    history = make_history(5)
+    window = ContextWindow(max_tokens=100_000, reserved_tokens=1000, cache_size=100)
+    
+    messages = window.build(SYSTEM, history, "Next question")
+    
+    assert messages[1:-1] == [{"role": role, "content": content} for _, role, content in history]
+
+
+def test_leading_assistant_message_dropped_when_truncated():
+    # Odd ids are assistant replies; leave room for exactly the last three messages
+    history = [(i, "user" if i % 2 == 0 else "assistant", "x" * 40) for i in range(10)]
+    user_message = "Next question"
+    fixed = payload_tokens([*SYSTEM, {"role": "user", "content": user_message}])
+    window = ContextWindow(
+        max_tokens=fixed + 3 * message_tokens("x" * 40),
+        reserved_tokens=0,
+        cache_size=100,
+    )
+    
+    messages = window.build(SYSTEM, history, user_message)
+    kept = messages[1:-1]
+    
+    # Messages 7 (assistant), 8 and 9 fit; the orphaned reply 7 is dropped
+    assert len(kept) == 2
+    assert kept[0]["role"] == "user"
+    assert messages.tokens == payload_tokens(messages)
+    assert [m["content"] for m in kept] == ["x" * 40] * 2
+
+
+def test_token_cache_hits_and_evicts(monkeypatch):
+    counted: list[str] = []
+    
+    def counting_message_tokens(content: str) -> int:
+        counted.append(content)
+        return message_tokens(content)
+    
+    monkeypatch.setattr(context, "message_tokens", counting_message_tokens)
+    window = ContextWindow(max_tokens=1000, reserved_tokens=0, cache_size=2)
+    
+    assert window.cached_tokens("a", "hello world") == message_tokens("hello world")
+    # A hit doesn't count again; stored messages never change, so content is ignored
+    assert window.cached_tokens("a", "something much longer than before") == message_tokens("hello world")
+    assert counted == ["hello world"]
+    
+    window.cached_tokens("b", "second")
+    window.cached_tokens("a", "hello world")  # "a" becomes most recently used
+    window.cached_tokens("c", "third")  # evicts "b", the least recently used
+    assert counted == ["hello world", "second", "third"]
+    
+    window.cached_tokens("a", "hello world")
+    window.cached_tokens("c", "third")
+    assert counted == ["hello world", "second", "third"]
+    
+    window.cached_tokens("b", "second")
+    assert counted == ["hello world", "second", "third", "second"]
@@ -0,0 +1,58 @@
+import pytest
+
+from app.services.llm.semantic_cache import SemanticCache
+
+PARAPHRASES = [
+    ("How do I reset my password?", "How can I reset my password?"),
+    ("How do I reset my password?", "how do i reset my password"),
+    ("How do I reset my password?", "How do I reset my pasword?"),
+    ("What is the refund policy?", "What's the refund policy?"),
+    ("Where is my order?", "Where's my order?"),
+    ("What is the price of the pro plan?", "what's the price of the pro plan"),
+]
+
+NEAR_MISSES = [
+    ("What is the price of the pro plan?", "What is the price of the basic plan?"),
+    ("Is it safe to take ibuprofen with alcohol?", "Is it safe to take ibuprofen with food?"),
+    ("How do I delete my account?", "How do I create my account?"),
+    ("Do you ship to Canada?", "Do you ship to Germany?"),
+    ("What are your opening hours?", "What are your opening hours on weekends?"),
+    ("Can I cancel my order?", "Can I not cancel my order?"),
+    ("Can I cancel my order?", "Why can't I cancel my order?"),
+]
+
+
+def make_cache() -> SemanticCache:
+    return SemanticCache(threshold=0.75, dim=512, max_entries=100, ttl=60)
+
+
+@pytest.mark.parametrize(("stored", "asked"), PARAPHRASES)
+async def test_paraphrase_reuses_answer(stored, asked):
+    cache = make_cache()
+    cache.store("project", "scope", stored, "answer")
+    
+    assert await cache.lookup("project", "scope", asked) == "answer"
+
+
+@pytest.mark.parametrize(("stored", "asked"), NEAR_MISSES)
+async def test_similar_but_different_question_misses(stored, asked):
+    cache = make_cache()
+    cache.store("project", "scope", stored, "answer")
+    
+    assert await cache.lookup("project", "scope", asked) is None
+
+
+async def test_best_candidate_with_same_content_wins():
+    cache = make_cache()
+    cache.store("project", "scope", "What is the price of the basic plan?", "basic")
+    cache.store("project", "scope", "Price of the pro plan?", "pro")
+    
+    assert await cache.lookup("project", "scope", "What is the price of the pro plan?") == "pro"
+
+
+async def test_answers_are_scoped():
+    cache = make_cache()
+    cache.store("project", "scope", "How do I reset my password?", "answer")
+    
+    assert await cache.lookup("other project", "scope", "How do I reset my password?") is None
+    assert await cache.lookup("project", "other scope", "How do I reset my password?") is None
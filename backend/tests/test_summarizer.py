@@ -0,0 +1,180 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import update
+
+from app.models.chat import ChatSession, Message, MessageRole
+from app.services.chat_service import ChatService
+from app.services.context import ContextWindow
+from app.services.prompt_cache import SystemPrefix
+from app.services.summarizer import SessionCompactor, Summarizer
+
+
+class StubSummarizer(Summarizer):
+    """Records each call and "summarizes" by listing the folded contents."""
+    
+    def __init__(self):
+        self.calls: list[tuple[str | None, list[dict[str, str]]]] = []
+    
+    async def summarize(self, previous_summary: str | None, messages: list[dict[str, str]]) -> str:
+        self.calls.append((previous_summary, messages))
+        folded = ",".join(m["content"] for m in messages)
+        return f"{previous_summary}|{folded}" if previous_summary else folded
+
+
+class FailingSummarizer(Summarizer):
+    def __init__(self):
+        self.calls = 0
+    
+    async def summarize(self, previous_summary: str | None, messages: list[dict[str, str]]) -> str:
+        self.calls += 1
+        raise RuntimeError("summarizer unavailable")
+
+
+async def make_session(session_factory, project, count: int) -> tuple[UUID, list[Message]]:
+    """A session with `count` alternating user/assistant messages "m0".."m<count-1>", a second apart."""
+    started = datetime(2024, 1, 1)
+    async with session_factory() as db, db.begin():
+        chat_session = ChatSession(id=uuid4(), project_id=project.id, version=1)
+        db.add(chat_session)
+        messages = [
+            Message(
+                id=uuid4(),
+                chat_session_id=chat_session.id,
+                role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+                content=f"m{i}",
+                timestamp=started + timedelta(seconds=i),
+            )
+            for i in range(count)
+        ]
+        db.add_all(messages)
+    return chat_session.id, messages
+
+
+async def load_session(session_factory, chat_session_id: UUID) -> ChatSession:
+    async with session_factory() as db:
+        return await db.get(ChatSession, chat_session_id)
+
+
+def make_compactor(summarizer: Summarizer, session_factory, **kwargs) -> SessionCompactor:
+    options = {"threshold": 10, "keep_recent": 4, "session_factory": session_factory, **kwargs}
+    return SessionCompactor(summarizer, **options)
+
+
+async def test_schedules_only_past_the_threshold(session_factory, project):
+    chat_session_id, _ = await make_session(session_factory, project, 12)
+    compactor = make_compactor(StubSummarizer(), session_factory)
+    
+    assert not compactor.maybe_schedule(chat_session_id, 10)
+    assert compactor.maybe_schedule(chat_session_id, 11)
+    # One compaction per session at a time
+    assert not compactor.maybe_schedule(chat_session_id, 11)
+    
+    await compactor.aclose()
+
+
+async def test_folds_all_but_the_newest_in_chunks(session_factory, project):
+    chat_session_id, messages = await make_session(session_factory, project, 12)
+    summarizer = StubSummarizer()
+    compactor = make_compactor(summarizer, session_factory, chunk_messages=3)
+    
+    assert await compactor.compact(chat_session_id)
+    
+    # 8 foldable messages (12 minus the 4 kept), at most 3 per call, oldest first
+    assert [[m["content"] for m in folded] for _, folded in summarizer.calls] == [
+        ["m0", "m1", "m2"],
+        ["m3", "m4", "m5"],
+        ["m6", "m7"],
+    ]
+    assert [previous for previous, _ in summarizer.calls] == [None, "m0,m1,m2", "m0,m1,m2|m3,m4,m5"]
+    
+    chat_session = await load_session(session_factory, chat_session_id)
+    assert chat_session.summary == "m0,m1,m2|m3,m4,m5|m6,m7"
+    assert chat_session.summary_message_id == messages[7].id
+    assert chat_session.summary_until == messages[7].timestamp
+    # Each committed chunk bumps the version, so cached contexts go stale
+    assert chat_session.version == 1 + 3
+    
+    # Nothing left to fold until more messages arrive
+    assert not await compactor.compact(chat_session_id)
+
+
+async def test_chunks_are_bounded_by_tokens(session_factory, project):
+    chat_session_id, _ = await make_session(session_factory, project, 12)
+    summarizer = StubSummarizer()
+    # Every message costs ~5 tokens with framing: two fit per chunk
+    compactor = make_compactor(summarizer, session_factory, chunk_tokens=10)
+    
+    assert await compactor.compact(chat_session_id)
+    
+    assert all(len(folded) <= 2 for _, folded in summarizer.calls)
+    assert sum(len(folded) for _, folded in summarizer.calls) == 8
+
+
+async def test_concurrent_compaction_is_not_overwritten(session_factory, project):
+    chat_session_id, messages = await make_session(session_factory, project, 12)
+    
+    class RacingSummarizer(StubSummarizer):
+        """Another worker advances the summary while this call is in flight."""
+        
+        async def summarize(self, previous_summary, folded):
+            async with session_factory() as db, db.begin():
+                await db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.id == chat_session_id)
+                    .values(
+                        summary="theirs",
+                        summary_message_id=messages[1].id,
+                        summary_until=messages[1].timestamp,
+                        version=ChatSession.version + 1,
+                    )
+                )
+            return await super().summarize(previous_summary, folded)
+    
+    compactor = make_compactor(RacingSummarizer(), session_factory)
+    
+    assert not await compactor.compact(chat_session_id)
+    
+    chat_session = await load_session(session_factory, chat_session_id)
+    assert chat_session.summary == "theirs"
+    assert chat_session.summary_message_id == messages[1].id
+    assert chat_session.version == 2
+
+
+async def test_failed_compaction_backs_off(session_factory, project):
+    chat_session_id, _ = await make_session(session_factory, project, 12)
+    summarizer = FailingSummarizer()
+    compactor = make_compactor(summarizer, session_factory, retry_backoff=0.5)
+    
+    assert compactor.maybe_schedule(chat_session_id, 12)
+    await asyncio.sleep(0.1)
+    
+    assert summarizer.calls == 1
+    assert not compactor.maybe_schedule(chat_session_id, 12)
+    
+    # Retried once the backoff has passed
+    await asyncio.sleep(0.5)
+    assert compactor.maybe_schedule(chat_session_id, 12)
+    await compactor.aclose()
+
+
+def test_build_messages_sends_summary_and_tail():
+    service = ChatService(
+        llm_provider=None,
+        context_window=ContextWindow(max_tokens=8192, reserved_tokens=1000, cache_size=100),
+    )
+    prefix = SystemPrefix.compile(0, "Support bot", ["Be concise."])
+    chat_session = ChatSession(id=uuid4(), summary="The user asked about refunds.")
+    tail = [(uuid4(), "user", "And shipping?"), (uuid4(), "assistant", "3-5 days.")]
+    
+    messages = service.build_messages(prefix, chat_session, tail, "Thanks!")
+    
+    assert messages == [
+        {"role": "system", "content": "Be concise."},
+        {"role": "system", "content": "Summary of the earlier conversation:\nThe user asked about refunds."},
+        {"role": "user", "content": "And shipping?"},
+        {"role": "assistant", "content": "3-5 days."},
+        {"role": "user", "content": "Thanks!"},
+    ]
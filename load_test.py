@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Load Testing Script for Chatbot Platform
+
+Async load generator built on the same API flow as test_api.py. Each
+virtual user registers, logs in, creates a project with a system prompt,
+then loops over a weighted mix of actions (chat, streamed chat, listings,
+new projects, re-logins) until the run ends. All users share one pooled
+httpx.AsyncClient, so connections are reused like a real client fleet.
+
+The report (JSON) has throughput, p50/p95/p99 latency and an error
+breakdown per endpoint, plus the git commit, so runs against the mock
+provider can be compared across commits:
+
+    # Server side: offline provider, cheap password hashing
+    LLM_PROVIDER=mock BCRYPT_ROUNDS=4 uvicorn app.main:app --workers 4
+
+    python load_test.py --users 200 --ramp linear --ramp-up 30 --duration 120 \\
+        --mix chat=60,chat_stream=15,list_projects=10,list_prompts=5,create_project=5,login=5 \\
+        --output load-report.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+API_BASE_URL = "http://localhost:8000"
+
+ACTIONS = ("chat", "chat_stream", "list_projects", "list_prompts", "create_project", "login")
+DEFAULT_MIX = "chat=60,chat_stream=15,list_projects=10,list_prompts=5,create_project=5,login=5"
+RAMP_PROFILES = ("instant", "linear", "step")
+
+QUESTIONS = [
+    "Hello! What is artificial intelligence?",
+    "Can you explain machine learning?",
+    "How do I reset my password?",
+    "What are your opening hours?",
+    "Can I get a refund for my last order?",
+    "Summarize our conversation so far.",
+]
+
+
+class Metrics:
+    """Latency samples and error counts per endpoint."""
+    
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, dict[str, int]] = {}
+    
+    def record(self, endpoint: str, seconds: float, error: Optional[str] = None) -> None:
+        self.latencies.setdefault(endpoint, [])
+        self.errors.setdefault(endpoint, {})
+        if error is None:
+            self.latencies[endpoint].append(seconds)
+        else:
+            self.errors[endpoint][error] = self.errors[endpoint].get(error, 0) + 1
+    
+    def report(self, elapsed: float) -> dict[str, Any]:
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            samples = sorted(self.latencies[endpoint])
+            errors = self.errors[endpoint]
+            failed = sum(errors.values())
+            endpoints[endpoint] = {
+                "requests": len(samples) + failed,
+                "ok": len(samples),
+                "errors": failed,
+                "error_rate": round(failed / (len(samples) + failed), 4) if samples or failed else 0.0,
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "latency_ms": _latency_summary(samples),
+                "errors_by_kind": dict(sorted(errors.items())),
+            }
+        
+        all_samples = sorted(s for samples in self.latencies.values() for s in samples)
+        failed = sum(sum(errors.values()) for errors in self.errors.values())
+        return {
+            "totals": {
+                "requests": len(all_samples) + failed,
+                "ok": len(all_samples),
+                "errors": failed,
+                "throughput_rps": round(len(all_samples) / elapsed, 2),
+                "latency_ms": _latency_summary(all_samples),
+            },
+            "endpoints": endpoints,
+        }
+
+
+def _latency_summary(samples: list[float]) -> Optional[dict[str, float]]:
+    """p50/p95/p99/mean/max of sorted samples, in milliseconds."""
+    if not samples:
+        return None
+    
+    def percentile(q: float) -> float:
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+    
+    return {
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "mean": round(statistics.fmean(samples) * 1000, 2),
+        "max": round(samples[-1] * 1000, 2),
+    }
+
+
+class StreamError(Exception):
+    """An SSE stream ended with an error event."""
+    
+    def __init__(self, status: Optional[int]):
+        super().__init__(f"stream error event (status {status})")
+        self.status = status
+
+
+def _error_kind(error: Exception) -> str:
+    """Bucket an exception for the error breakdown: HTTP status, timeout, connection, ..."""
+    if isinstance(error, StreamError):
+        return f"stream {error.status or 'error'}"
+    if isinstance(error, httpx.HTTPStatusError):
+        return str(error.response.status_code)
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+    return type(error).__name__
+
+
+class AsyncChatbotClient:
+    """
+    Async counterpart of test_api.ChatbotClient for one virtual user.
+    
+    Shares a pooled httpx.AsyncClient with the other users and records
+    every call's latency (or error kind) under its endpoint in `metrics`.
+    """
+    
+    def __init__(self, http: httpx.AsyncClient, metrics: Metrics):
+        self.http = http
+        self.metrics = metrics
+        self.token: Optional[str] = None
+    
+    async def _call(self, endpoint: str, request: Callable[[], Awaitable[httpx.Response]]) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await request()
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self.metrics.record(endpoint, time.perf_counter() - started, _error_kind(e))
+            raise
+        self.metrics.record(endpoint, time.perf_counter() - started)
+        return data
+    
+    def _headers(self) -> dict:
+        """Get headers with authentication."""
+        if not self.token:
+            raise ValueError("Not authenticated. Call login() first.")
+        return {"Authorization": f"Bearer {self.token}"}
+    
+    async def register(self, email: str, password: str) -> dict:
+        """Register a new user."""
+        return await self._call(
+            "POST /auth/register",
+            lambda: self.http.post("/auth/register", json={"email": email, "password": password}),
+        )
+    
+    async def login(self, email: str, password: str) -> dict:
+        """Login and save access token."""
+        data = await self._call(
+            "POST /auth/login",
+            lambda: self.http.post("/auth/login", data={"username": email, "password": password}),
+        )
+        self.token = data["access_token"]
+        return data
+    
+    async def create_project(self, name: str, description: str = "") -> dict:
+        """Create a new project."""
+        return await self._call(
+            "POST /projects",
+            lambda: self.http.post(
+                "/projects",
+                headers=self._headers(),
+                json={"name": name, "description": description},
+            ),
+        )
+    
+    async def list_projects(self) -> dict:
+        """List projects (first page)."""
+        return await self._call(
+            "GET /projects",
+            lambda: self.http.get("/projects", headers=self._headers()),
+        )
+    
+    async def create_prompt(self, project_id: str, content: str) -> dict:
+        """Create a prompt for a project."""
+        return await self._call(
+            "POST /projects/{id}/prompts",
+            lambda: self.http.post(
+                f"/projects/{project_id}/prompts",
+                headers=self._headers(),
+                json={"content": content},
+            ),
+        )
+    
+    async def list_prompts(self, project_id: str) -> dict:
+        """List prompts for a project."""
+        return await self._call(
+            "GET /projects/{id}/prompts",
+            lambda: self.http.get(f"/projects/{project_id}/prompts", headers=self._headers()),
+        )
+    
+    async def chat(self, project_id: str, message: str, session_id: Optional[str] = None) -> dict:
+        """Send a chat message."""
+        data = {"project_id": project_id, "message": message}
+        if session_id:
+            data["session_id"] = session_id
+        
+        return await self._call(
+            "POST /chat",
+            lambda: self.http.post("/chat", headers=self._headers(), json=data),
+        )
+    
+    async def chat_stream(self, project_id: str, message: str, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        Send a chat message over SSE and read the stream to the end.
+        
+        Records the time to the first event separately, as
+        "POST /chat/stream (first event)". Returns the session id.
+        """
+        data = {"project_id": project_id, "message": message}
+        if session_id:
+            data["session_id"] = session_id
+        
+        endpoint = "POST /chat/stream"
+        started = time.perf_counter()
+        first_event = None
+        event = None
+        try:
+            async with self.http.stream("POST", "/chat/stream", headers=self._headers(), json=data) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                        if first_event is None:
+                            first_event = time.perf_counter() - started
+                    elif line.startswith("data:") and event == "session":
+                        session_id = json.loads(line[len("data:"):]).get("session_id", session_id)
+                    elif line.startswith("data:") and event == "error":
+                        raise StreamError(json.loads(line[len("data:"):]).get("status"))
+        except Exception as e:
+            self.metrics.record(endpoint, time.perf_counter() - started, _error_kind(e))
+            raise
+        
+        self.metrics.record(endpoint, time.perf_counter() - started)
+        if first_event is not None:
+            self.metrics.record(f"{endpoint} (first event)", first_event)
+        return session_id
+
+
+class VirtualUser:
+    """One simulated user: sets up an account and project, then runs the action mix."""
+    
+    def __init__(self, index: int, run_id: str, http: httpx.AsyncClient, metrics: Metrics, args: argparse.Namespace):
+        self.email = f"load-{run_id}-{index}@example.com"
+        self.password = "loadtest-password"
+        self.client = AsyncChatbotClient(http, metrics)
+        self.args = args
+        self.rng = random.Random(f"{args.seed}-{index}")
+        self.project_ids: list[str] = []
+        self.session_id: Optional[str] = None
+        self.session_turns = 0
+    
+    async def setup(self) -> None:
+        await self.client.register(self.email, self.password)
+        await self.client.login(self.email, self.password)
+        await self.new_project()
+    
+    async def new_project(self) -> None:
+        project = await self.client.create_project(f"Load test {len(self.project_ids)}", "load_test.py")
+        await self.client.create_prompt(project["id"], "You are a helpful assistant. Keep answers short.")
+        self.project_ids.append(project["id"])
+    
+    def _next_turn(self) -> tuple[str, Optional[str]]:
+        """A question and the session to ask it in (a new one every --session-turns turns)."""
+        if self.session_turns >= self.args.session_turns:
+            self.session_id = None
+            self.session_turns = 0
+        self.session_turns += 1
+        return self.rng.choice(QUESTIONS), self.session_id
+    
+    async def act(self, action: str) -> None:
+        project_id = self.project_ids[-1]
+        
+        if action == "chat":
+            message, session_id = self._next_turn()
+            self.session_id = (await self.client.chat(project_id, message, session_id))["session_id"]
+        elif action == "chat_stream":
+            message, session_id = self._next_turn()
+            self.session_id = await self.client.chat_stream(project_id, message, session_id)
+        elif action == "list_projects":
+            await self.client.list_projects()
+        elif action == "list_prompts":
+            await self.client.list_prompts(project_id)
+        elif action == "create_project":
+            await self.new_project()
+            self.session_id = None
+        elif action == "login":
+            await self.client.login(self.email, self.password)
+    
+    async def run(self, start_delay: float, deadline: float, mix: dict[str, float]) -> None:
+        await asyncio.sleep(start_delay)
+        if time.monotonic() >= deadline:
+            return
+        
+        try:
+            await self.setup()
+        except Exception:
+            return  # Counted in the metrics; a user without an account can't do anything else
+        
+        actions, weights = list(mix), list(mix.values())
+        while time.monotonic() < deadline:
+            try:
+                await self.act(self.rng.choices(actions, weights)[0])
+            except Exception:
+                self.session_id = None
+            
+            if self.args.think_time > 0:
+                await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse "chat=60,login=5,..." into action weights."""
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown action {name!r} in --mix, expected one of {', '.join(ACTIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def start_delays(users: int, profile: str, ramp_up: float, steps: int) -> list[float]:
+    """Seconds after the start at which each virtual user begins."""
+    if profile == "instant" or ramp_up <= 0:
+        return [0.0] * users
+    if profile == "linear":
+        return [ramp_up * i / users for i in range(users)]
+    # step: users arrive in `steps` equal batches spread over the ramp-up
+    batch = max(1, -(-users // steps))
+    return [ramp_up * (i // batch) / steps for i in range(users)]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    mix = parse_mix(args.mix)
+    metrics = Metrics()
+    run_id = uuid.uuid4().hex[:8]
+    
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as http:
+        started = time.monotonic()
+        deadline = started + args.duration
+        users = [VirtualUser(i, run_id, http, metrics, args) for i in range(args.users)]
+        delays = start_delays(args.users, args.ramp, args.ramp_up, args.steps)
+        await asyncio.gather(*(user.run(delay, deadline, mix) for user, delay in zip(users, delays)))
+        elapsed = time.monotonic() - started
+    
+    return {
+        "run_id": run_id,
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "duration_s": round(elapsed, 2),
+        "config": {
+            "base_url": args.base_url,
+            "users": args.users,
+            "ramp": args.ramp,
+            "ramp_up_s": args.ramp_up,
+            "think_time_s": args.think_time,
+            "session_turns": args.session_turns,
+            "mix": mix,
+        },
+        **metrics.report(elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=API_BASE_URL)
+    parser.add_argument("--users", type=int, default=50, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Run length in seconds, ramp-up included")
+    parser.add_argument("--ramp", choices=RAMP_PROFILES, default="linear")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Seconds over which users are started")
+    parser.add_argument("--steps", type=int, default=5, help="Batches for the step ramp profile")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted action mix, name=weight comma-separated")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between a user's actions (seconds)")
+    parser.add_argument("--session-turns", type=int, default=5, help="Turns per chat session before starting a new one")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    
+    try:
+        report = asyncio.run(run(args))
+    except ValueError as e:
+        parser.error(str(e))
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        totals = report["totals"]
+        print(
+            f"{totals['requests']} requests, {totals['errors']} errors, "
+            f"{totals['throughput_rps']} req/s -> {args.output}",
+            file=sys.stderr,
+        )
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
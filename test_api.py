@@ -64,7 +64,8 @@ class ChatbotClient:
         """List all projects."""
         response = requests.get(
             f"{self.base_url}/projects",
-            headers=self._headers()
+            headers=self._headers(),
+            params={"include_total": True}
         )
         response.raise_for_status()
         return response.json()
@@ -92,7 +93,8 @@ class ChatbotClient:
         """List prompts for a project."""
         response = requests.get(
             f"{self.base_url}/projects/{project_id}/prompts",
-            headers=self._headers()
+            headers=self._headers(),
+            params={"include_total": True}
         )
         response.raise_for_status()
         return response.json()